@@ -542,7 +542,7 @@ class Backend(object):
         :type memory_name: str
         :param offset_byte: Byte offset within memory to start writing to.
         :type offset_byte: int
-        :param data: Raw data bytes to write
+        :param data: Raw data bytes to write.  The data is not modified, any page alignment is done on a copy
         :type data: bytearray
 
         :raises PymcuprogToolConnectionError: if not connected to any tool (connect_to_tool not run)
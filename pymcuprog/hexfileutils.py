@@ -1,7 +1,6 @@
 """
 Module providing read and write functionality towards hex files with data intended for target device memories
 """
-import copy
 import os
 from array import array
 from collections import namedtuple
@@ -13,6 +12,8 @@ except ImportError:
 
 from .deviceinfo.deviceinfokeys import DeviceMemoryInfoKeys, DeviceInfoKeys
 
+MemorySegment = namedtuple('MemorySegment', 'data offset memory_info')
+
 def write_memories_to_hex(filename, memory_segments):
     """
     Write a collection of memory segments to a hex file
@@ -82,19 +83,15 @@ def read_memories_from_hex(filename, device_memory_info):
             if stop < subsegment_stop:
                 # Reached end of segment
                 subsegment_stop = stop
-            memory_tuple = namedtuple('MemorySegment', 'data offset memory_info')
-
             data = hexfile.tobinarray(start=subsegment_start, end=subsegment_stop - 1)
             current_size = current_memory_info[DeviceMemoryInfoKeys.SIZE]
             if current_hexfile_size == current_size*2:
                 # There are phantom bytes in the hexfile (PIC16 EEPROM), so every 2nd byte should be removed
                 data = remove_phantom_bytes(data)
 
-            memory_tuple.data = data
-            memory_tuple.memory_info = current_memory_info
-            memory_tuple.offset = subsegment_start - current_hexfile_address
-
-            memory_segments.append(copy.deepcopy(memory_tuple))
+            memory_segments.append(MemorySegment(data=data,
+                                                 offset=subsegment_start - current_hexfile_address,
+                                                 memory_info=current_memory_info))
 
             subsegment_start = subsegment_stop
 
@@ -104,14 +101,9 @@ def remove_phantom_bytes(data):
     """
     Remove every 2nd byte from the data
     """
-    data_stripped = []
-    for index in range(0, len(data), 2):
-        data_stripped.append(data[index])
-    # Make a bin array out of the data list to be consistent with the data format of
+    # Make a bin array out of the data to be consistent with the data format of
     # the data fetched directly from the hex file
-    data_stripped_binarray = array('B')
-    data_stripped_binarray.fromlist(data_stripped)
-    return data_stripped_binarray
+    return array('B', data[::2])
 
 def _add_data_to_hex(intelhex, data, memory_info, offset=0):
     """
@@ -55,6 +55,7 @@ class NvmAccessProviderSerial(NvmAccessProvider):
         port = transport.serialport
         timeout = transport.timeout
         baudrate = transport.baudrate
+        self.boost_baudrate = transport.boost_baudrate
         self.avr = None
         self.options = options
         NvmAccessProvider.__init__(self, device_info)
@@ -68,7 +69,7 @@ class NvmAccessProviderSerial(NvmAccessProvider):
         Start (activate) session for UPDI serial targets
         """
         try:
-            self.avr.enter_progmode()
+            self.avr.enter_progmode(boost_baud=self.boost_baudrate)
         except PymcuprogSerialUpdiLockedError:
             if ('user-row-locked-device' in self.options and self.options['user-row-locked-device']):
                 self.logger.info("Device is locked. Proceeding to write USER ROW...")
@@ -86,14 +87,14 @@ class NvmAccessProviderSerial(NvmAccessProvider):
         :raises PymcuprogSessionError: if device ID does not match
         """
         sib_info = self.avr.read_device_info()
-        self.logger.info("Device family: '%s'", sib_info['family'])
+        self.logger.info("Device family: '%s'", sib_info.family)
 
         signatures_base = self.dut.sigrow_address
 
         # Read 3 bytes
         sig = self.avr.read_data(signatures_base, 3)
         if len(sig) != 3:
-            self.logger.error("Unable to read signature for detected device in family: '%s'", sib_info['family'])
+            self.logger.error("Unable to read signature for detected device in family: '%s'", sib_info.family)
             raise PymcuprogSessionError("Unable to read device ID")
 
         device_id_read = binary.unpack_be24(sig)
@@ -180,26 +181,31 @@ class NvmAccessProviderSerial(NvmAccessProvider):
             self.avr.write_user_row_locked_device(offset_aligned, data_aligned)
             return
 
-        while data_aligned:
-            if len(data_aligned) < write_chunk_size:
-                write_chunk_size = len(data_aligned)
-            chunk = data_aligned[0:write_chunk_size]
-            self.logger.debug("Writing %d bytes to address 0x%06X", write_chunk_size, offset_aligned)
+        # Split the data into chunks, stepping through it instead of slicing off what has been written, which would
+        # copy the rest of the image for every chunk
+        chunks = ((offset_aligned + index, data_aligned[index:index + write_chunk_size])
+                  for index in range(0, len(data_aligned), max(write_chunk_size, 1)))
+
+        # Anything not handled as fuses, EEPROM or rows is written as flash, which the NVM driver may keep set up
+        # for the whole sequence of pages
+        if memtype_string not in (MemoryNames.FUSES, MemoryNames.LOCKBITS, MemoryNames.EEPROM,
+                                  MemoryNames.USER_ROW, MemoryNames.BOOT_ROW):
+            self.avr.nvm.write_flash_pages(chunks)
+            return
+
+        for address, chunk in chunks:
+            self.logger.debug("Writing %d bytes to address 0x%06X", len(chunk), address)
             if memtype_string == MemoryNames.FUSES:
-                self.avr.nvm.write_fuse(offset_aligned, chunk)
+                self.avr.nvm.write_fuse(address, chunk)
             elif memtype_string == MemoryNames.LOCKBITS:
                 # Lockbits are accessed like fuses
-                self.avr.nvm.write_fuse(offset_aligned, chunk)
+                self.avr.nvm.write_fuse(address, chunk)
             elif memtype_string == MemoryNames.EEPROM:
-                self.avr.nvm.write_eeprom(offset_aligned, chunk)
+                self.avr.nvm.write_eeprom(address, chunk)
             elif memtype_string == MemoryNames.USER_ROW:
-                self.avr.nvm.write_user_row(offset_aligned, chunk)
+                self.avr.nvm.write_user_row(address, chunk)
             elif memtype_string == MemoryNames.BOOT_ROW:
-                self.avr.nvm.write_user_row(offset_aligned, chunk)
-            else:
-                self.avr.nvm.write_flash(offset_aligned, chunk)
-            offset_aligned += write_chunk_size
-            data_aligned = data_aligned[write_chunk_size:]
+                self.avr.nvm.write_user_row(address, chunk)
 
     def read(self, memory_info, offset, numbytes):
         """
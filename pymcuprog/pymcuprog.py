@@ -161,6 +161,8 @@ def main():
         - specify which serial port to use using the switch '--uart <serialport>'
         - optionally specify the baud rate using the switch '--clk <baud>'
         - optionally specify the uart read timeout using the switch '--uart-timeout <timeout>'
+        - optionally specify a faster baud rate to use once in programming mode using the switch
+          '--uart-boost-clk <baud>'
         - use the basic actions for accessing memories as shown above
 
         Example:
@@ -231,7 +233,7 @@ def main():
                         help="literal values to write")
 
     filename_helpstring_extra = "Note that when reading to hex file only "
-    filename_helpstring_extra += ", ".join(WRITE_TO_HEX_MEMORIES)
+    filename_helpstring_extra += ", ".join(sorted(WRITE_TO_HEX_MEMORIES))
     filename_helpstring_extra += " memories will be written to the hex file"
     parser.add_argument("-f", "--filename",
                         type=str,
@@ -252,6 +254,11 @@ def main():
                         default="1.0",
                         help="Timeout for read operations to complete (when using -t uart).  Defaults to 1.0s")
 
+    parser.add_argument("--uart-boost-clk",
+                        type=str,
+                        help="baud rate in bps to switch to once in programming mode (when using -t uart). "
+                        "(eg: '--uart-boost-clk 460800' or '--uart-boost-clk 1M')")
+
     parser.add_argument("-i", "--interface",
                         type=str,
                         help="Programming interface to use")
@@ -7,7 +7,6 @@ from __future__ import print_function
 # utils
 import time
 import os
-from copy import copy
 from logging import getLogger
 
 from pyedbglib.util.hex_to_uf2 import hex_to_uf2
@@ -19,7 +18,7 @@ from .deviceinfo.eraseflags import ChiperaseEffect
 from .deviceinfo.deviceinfo import get_supported_devices
 from .deviceinfo.deviceinfokeys import DeviceMemoryInfoKeys
 
-from .utils import print_tool_info, showdata, verify_from_bin, compare
+from .utils import print_tool_info, showdata, verify_from_bin, compare, enum
 from .hexfileutils import write_memories_to_hex, write_memory_to_hex, read_memories_from_hex
 from .pymcuprog_errors import PymcuprogNotSupportedError, PymcuprogSessionConfigError, \
     PymcuprogToolConnectionError, PymcuprogDeviceLockedError, PymcuprogError
@@ -32,11 +31,27 @@ except ImportError:
     COMMIT_ID = "N/A"
     BUILD_DATE = "N/A"
 
+try:
+    from time import monotonic
+except ImportError:
+    # Python 2.7 has no monotonic clock
+    from time import time as monotonic
+
+try:
+    from time import perf_counter
+except ImportError:
+    # Python 2.7 has no performance counter
+    from time import time as perf_counter
+
 STATUS_SUCCESS = 0
 STATUS_FAILURE = 1
 
 # Only include memories that can be written when writing memories to hex file
-WRITE_TO_HEX_MEMORIES = [MemoryNames.EEPROM, MemoryNames.FLASH, MemoryNames.FUSES, MemoryNames.CONFIG_WORD, MemoryNames.USER_ROW]
+WRITE_TO_HEX_MEMORIES = frozenset([MemoryNames.EEPROM, MemoryNames.FLASH, MemoryNames.FUSES, MemoryNames.CONFIG_WORD,
+                                   MemoryNames.USER_ROW])
+
+# File types supported for read, write and verify, given by the file name extension
+FileType = enum(HEX='hex', BINARY='bin')
 
 def pymcuprog(args):
     """
@@ -95,7 +110,7 @@ def pymcuprog(args):
     time_start = None
     if args.timing:
         print("Starting timer")
-        time_start = time.time()
+        time_start = perf_counter()
     try:
         status = _programming_actions(backend, args)
 
@@ -111,7 +126,7 @@ def pymcuprog(args):
     backend.end_session()
     backend.disconnect_from_tool()
     if args.timing:
-        time_stop = time.time()
+        time_stop = perf_counter()
         print("Operation took {0:.03f}s".format(time_stop - time_start))
 
     print("Done.")
@@ -148,16 +163,36 @@ def _action_setsupplyvoltage(backend, literal):
             voltage = backend.read_supply_voltage_setpoint()
             print("Supply voltage is now set to {0:0.2f}V".format(voltage))
 
-            # Static delay to let the target voltage settle before reading it out
-            # Alternatively a retry loop could be used, but it is difficult to know when to terminate
-            # the loop as sometimes the final voltage is not known, for example if setting the voltage
-            # to 5.5V the actual voltage will depend upon the USB voltage.  If the USB voltage is only
-            # 4.9V the target voltage will never reach more than 4.9V
-            time.sleep(0.5)
-            voltage = backend.read_target_voltage()
+            voltage = _wait_for_target_voltage(backend, setvoltage)
             print("Measured voltage: {0:0.2f}V".format(voltage))
     return STATUS_SUCCESS
 
+def _wait_for_target_voltage(backend, setvoltage, timeout_s=0.5, poll_interval_s=0.02):
+    """
+    Wait for the target voltage to settle after changing the supply voltage setpoint
+
+    Polls the target voltage until it is stable and close to the setpoint.  The final voltage is not always known, for
+    example if setting the voltage to 5.5V the actual voltage will depend upon the USB voltage.  If the USB voltage is
+    only 4.9V the target voltage will never reach more than 4.9V.  The polling is therefore bounded by a timeout and
+    the last voltage measured is returned in any case.
+
+    :param backend: pymcuprog Backend instance
+    :param setvoltage: Supply voltage setpoint in Volts
+    :param timeout_s: Maximum time to wait in seconds
+    :param poll_interval_s: Time between each target voltage measurement in seconds
+    :return: Last measured target voltage
+    """
+    deadline = monotonic() + timeout_s
+    previous_voltage = None
+    while True:
+        voltage = backend.read_target_voltage()
+        if previous_voltage is not None and abs(voltage - previous_voltage) < 0.02 and abs(voltage - setvoltage) < 0.05:
+            return voltage
+        if monotonic() >= deadline:
+            return voltage
+        previous_voltage = voltage
+        time.sleep(poll_interval_s)
+
 def _action_reboot_debugger(backend):
     print("Rebooting tool...")
     backend.reboot_tool()
@@ -166,9 +201,8 @@ def _action_reboot_debugger(backend):
 def _action_ping(backend):
     print("Pinging device...")
     response = backend.read_device_id()
-    idstring = ''
-    for idbyte in response:
-        idstring = '{:02X}'.format(idbyte) + idstring
+    # Device ID is little endian, print it MSB first
+    idstring = "".join("{:02X}".format(idbyte) for idbyte in reversed(response))
     print("Ping response: {}".format(idstring))
     return STATUS_SUCCESS
 
@@ -205,20 +239,12 @@ def _action_read(backend, args):
     result = backend.read_memory(args.memory, args.offset, args.bytes)
 
     # If a filename is specified, write to it
-    hexfile = False
-    binary = False
-    filepath = None
+    filetype = filepath = prefix = postfix = None
     if args.filename is not None:
-        filepath = os.path.normpath(args.filename)
-        prefix, postfix = _get_file_prefix_and_postfix(filepath)
-        # If it ends in hex, use Intel(R) hex format, else binary
-        if postfix == 'hex':
-            hexfile = True
-        else:
-            binary = True
+        filetype, filepath, prefix, postfix = _classify_file(args.filename)
 
     # Print the data or save it to a file
-    if hexfile:
+    if filetype == FileType.HEX:
         if args.memory == MemoryNameAliases.ALL:
             # Only memories that can be written should go into the hex file
             result_to_write = _extract_writeable_memories(result)
@@ -226,9 +252,10 @@ def _action_read(backend, args):
         else:
             write_memory_to_hex(filepath, result[0], args.offset)
         print("Data written to hex file: '{0:s}'".format(filepath))
-    elif binary:
+    elif filetype == FileType.BINARY:
+        name_key = DeviceMemoryInfoKeys.NAME
         for item in result:
-            memory_name = item.memory_info[DeviceMemoryInfoKeys.NAME]
+            memory_name = item.memory_info[name_key]
             data = item.data
             filepath = "{}_{}.{}".format(prefix, memory_name, postfix)
             # Binary files does not have addressing, and needs a split on memory type
@@ -236,48 +263,44 @@ def _action_read(backend, args):
                 binfile.write(data)
             print("Data written to binary file: '{0:s}'".format(filepath))
     else:
+        name_key = DeviceMemoryInfoKeys.NAME
+        hexfile_size_key = DeviceMemoryInfoKeys.HEXFILE_SIZE
+        size_key = DeviceMemoryInfoKeys.SIZE
+        address_key = DeviceMemoryInfoKeys.ADDRESS
+        page_size_key = DeviceMemoryInfoKeys.PAGE_SIZE
         for item in result:
             memory_info = item.memory_info
-            memory_name = memory_info[DeviceMemoryInfoKeys.NAME]
-            memory_hexfile_size = memory_info[DeviceMemoryInfoKeys.HEXFILE_SIZE]
-            memory_size = memory_info[DeviceMemoryInfoKeys.SIZE]
+            memory_name = memory_info[name_key]
+            # PIC16 is word (16-bit) addressed, but each word address only contains one byte of actual data
+            # for EEPROM, the other byte is a phantom byte
+            phantom_bytes = 1 if memory_info[hexfile_size_key] == 2*memory_info[size_key] else 0
             print("Memory type: {}".format(memory_name))
             showdata(item.data,
-                     args.offset + memory_info[DeviceMemoryInfoKeys.ADDRESS],
-                     memory_info[DeviceMemoryInfoKeys.PAGE_SIZE],
-                     # PIC16 is word (16-bit) addressed, but each word address only contains one byte of actual data
-                     # for EEPROM, the other byte is a phantom byte
-                     phantom_bytes= 1 if memory_hexfile_size == 2*memory_size else 0)
+                     args.offset + memory_info[address_key],
+                     memory_info[page_size_key],
+                     phantom_bytes=phantom_bytes)
             print("\n")
 
     return STATUS_SUCCESS
 
 def _action_verify(backend, args):
-    hexfile = False
-    binary = False
+    filetype = None
     literal = False
-    filepath = None
     if args.filename is not None:
-        filepath = os.path.normpath(args.filename)
-        _, postfix = _get_file_prefix_and_postfix(filepath)
-        # If it ends in hex, use Intel hex format, else binary
-        if postfix == 'hex':
-            hexfile = True
-        else:
-            binary = True
+        filetype, _, _, _ = _classify_file(args.filename)
     if args.literal is not None:
         literal = True
         if args.filename is not None:
             print("Both file and literal value was specified. Literal verify will be ignored in favor of file verify")
             literal = False
 
-    if hexfile:
+    if filetype == FileType.HEX:
         print("Verifying...")
 
         verify_status = backend.verify_hex(args.filename)
         if verify_status is True:
             print("Verify successful. Data in device matches data in specified hex-file")
-    elif binary:
+    elif filetype == FileType.BINARY:
         print("Verifying...")
         verify_status = verify_from_bin(args.filename, backend, args.offset, args.memory)
         if verify_status is True:
@@ -292,6 +315,39 @@ def _action_verify(backend, args):
 
     return STATUS_SUCCESS
 
+def _read_binary_file(filepath):
+    """
+    Read the contents of a binary file
+
+    The file is read straight into a buffer of the file size to avoid an intermediate bytes copy.  The size is only a
+    hint: a short read is truncated, and anything after it (eg: from a pipe) is read as well.
+
+    :param filepath: File name and path
+    :return: file contents
+    :rtype: bytearray
+    """
+    with open(filepath, "rb") as binfile:
+        data = bytearray(os.fstat(binfile.fileno()).st_size)
+        numbytes = binfile.readinto(data) or 0
+        del data[numbytes:]
+        data.extend(binfile.read())
+    return data
+
+def _classify_file(filename):
+    """
+    Find the type of a file from its file name
+
+    Files ending in .hex (in any case) are Intel(R) hex files, any other file is supposed to be a binary file
+
+    :param filename: File name and path
+    :return: filetype (FileType), normalized filepath, prefix, postfix
+    """
+    filepath = os.path.normpath(filename)
+    prefix, postfix = _get_file_prefix_and_postfix(filepath)
+    if postfix == FileType.HEX:
+        return FileType.HEX, filepath, prefix, postfix
+    return FileType.BINARY, filepath, prefix, postfix
+
 def _get_file_prefix_and_postfix(filepath):
     """
     Get file prefix and postfix from the filepath
@@ -300,13 +356,12 @@ def _get_file_prefix_and_postfix(filepath):
     :param filepath: File name and full path
     :return: prefix, postfix
     """
-    prefix = filepath.split('.')[0]
-    postfix = filepath.split('.')[-1].lower()
-    # If no "." is found in the filepath
-    if postfix == prefix:
-        postfix = "bin"
+    prefix, extension = os.path.splitext(filepath)
+    # If the file name has no extension
+    if not extension:
+        return prefix, "bin"
 
-    return prefix, postfix
+    return prefix, extension[1:].lower()
 
 def _extract_writeable_memories(memory_segments):
     """
@@ -318,19 +373,14 @@ def _extract_writeable_memories(memory_segments):
     :return: List of namedtuples (a subset of the memory_segments input parameter) only containing memory segments
         that can be written
     """
-    writeable_segments = []
-    for segment in memory_segments:
-        if segment.memory_info[DeviceMemoryInfoKeys.NAME] in WRITE_TO_HEX_MEMORIES:
-            writeable_segments.append(segment)
-    return writeable_segments
+    name_key = DeviceMemoryInfoKeys.NAME
+    return [segment for segment in memory_segments if segment.memory_info[name_key] in WRITE_TO_HEX_MEMORIES]
 
 def _action_write(backend, args):
     # If a filename is specified, read from it
     if args.filename is not None:
-        filepath = os.path.normpath(args.filename)
-        _, postfix = _get_file_prefix_and_postfix(filepath)
-        # If it ends in hex, use Intel hex format, else binary
-        if postfix == 'hex':
+        filetype, filepath, _, _ = _classify_file(args.filename)
+        if filetype == FileType.HEX:
             # Hexfiles contain addressing information that cannot be remapped, so offset/memory are not allowed here
             if args.offset:
                 print("Offset cannot be specified when writing hex file")
@@ -354,17 +404,14 @@ def _action_write(backend, args):
 
             return _write_memory_segments(backend, result, args.verify)
         else:
-            with open(filepath, "rb") as binfile:
-                data_from_file = bytearray(binfile.read())
+            data_from_file = _read_binary_file(filepath)
 
             if args.erase:
                 raise PymcuprogNotSupportedError("Erase switch (--erase) is only supported when writing a hex file!")
             # Prepare and write data
             print("Writing from binary file...")
-            # When writing data to target the data might be page-aligned so we make a copy to avoid verifying
-            # more than needed (in case verify option is enabled)
-            data_to_write = copy(data_from_file)
-            backend.write_memory(data_to_write, args.memory, args.offset)
+            # Any page alignment done when writing is done on a copy, so the same data can be used for verify
+            backend.write_memory(data_from_file, args.memory, args.offset)
             if args.verify:
                 print("Verifying from binary file...")
                 # Verify content, an exception is thrown on mismatch
@@ -375,11 +422,12 @@ def _action_write(backend, args):
             raise PymcuprogNotSupportedError("Erase switch (--erase) is only supported when writing a hex file!")
         # Prepare and write data
         print("Writing literal values...")
-        backend.write_memory(bytearray(args.literal), args.memory, args.offset)
+        data_literal = bytearray(args.literal)
+        backend.write_memory(data_literal, args.memory, args.offset)
         if args.verify:
             print("Verifying literal values...")
             # Verify content, an exception is thrown on mismatch
-            if not backend.verify_memory(bytearray(args.literal), args.memory, args.offset):
+            if not backend.verify_memory(data_literal, args.memory, args.offset):
                 return STATUS_FAILURE
     else:
         print("Error: for writing use either -f <file> or -l <literal>")
@@ -481,6 +529,21 @@ def _programming_actions(backend, args):
 
     return status
 
+def _frequency_as_int(frequency):
+    """
+    Converts a frequency argument with an optional 'k' or 'M' suffix into an int
+
+    :param frequency: frequency argument (eg: '32768', '115k' or '1M')
+    :return: int representation of the frequency or None if not provided
+    """
+    if frequency:
+        if frequency[-1] == 'k':
+            return int(frequency.strip('k')) * 1000
+        if frequency[-1] == 'M':
+            return int(frequency.strip('M')) * 1000000
+        return int(frequency)
+    return None
+
 def _clk_as_int(args):
     """
     Converts the clk argument into an int
@@ -488,15 +551,7 @@ def _clk_as_int(args):
     :param args: argument list
     :return: int representation of clk argument or None if not provided
     """
-    if args.clk:
-        if args.clk[-1] == 'k':
-            clk = int(args.clk.strip('k')) * 1000
-        elif args.clk[-1] == 'M':
-            clk = int(args.clk.strip('M')) * 1000000
-        else:
-            clk = int(args.clk)
-        return clk
-    return None
+    return _frequency_as_int(args.clk)
 
 def _setup_tool_connection(args):
     toolconnection = None
@@ -504,8 +559,10 @@ def _setup_tool_connection(args):
     # Parse the requested tool from the CLI
     if args.tool == "uart":
         baudrate = _clk_as_int(args)
+        boost_baudrate = _frequency_as_int(args.uart_boost_clk)
         # Embedded GPIO/UART tool (eg: raspberry pi) => no USB connection
-        toolconnection = ToolSerialConnection(serialport=args.uart, baudrate=baudrate, timeout=args.uart_timeout)
+        toolconnection = ToolSerialConnection(serialport=args.uart, baudrate=baudrate, timeout=args.uart_timeout,
+                                              boost_baudrate=boost_baudrate)
     else:
         usb_serial = args.serialnumber
         product = args.tool
@@ -1,11 +1,12 @@
 """
 Application layer for UPDI stack
 """
+import time
+from collections import namedtuple
 from logging import getLogger
 from pymcuprog.pymcuprog_errors import PymcuprogSerialUpdiError, PymcuprogSerialUpdiLockedError
 from . import constants
 from .link import UpdiDatalink16bit, UpdiDatalink24bit
-from .nvm import NvmUpdi
 from .nvmp0 import NvmUpdiP0
 from .nvmp2 import NvmUpdiP2
 from .nvmp3 import NvmUpdiP3
@@ -15,6 +16,30 @@ from .readwrite import UpdiReadWrite
 from .physical import UpdiPhysical
 from .timeout import Timeout
 
+# Each status poll is a serial round trip, so the first FAST_POLLS polls are sent back to back.  After that the delay
+# between polls starts at POLL_DELAY_MIN_S and doubles up to POLL_DELAY_MAX_S, which bounds how late a change is seen.
+FAST_POLLS = 8
+POLL_DELAY_MIN_S = 0.0005
+POLL_DELAY_MAX_S = 0.002
+
+# NVM driver and datalink to use for each NVM version in the SIB.  A datalink of None keeps the 24-bit datalink.
+# P:0 = tiny0, 1, 2; mega0 (16-bit, page oriented)
+# P:1 = N/A
+# P:2 = AVR DA, DB, DD (24-bit, word-oriented)
+# P:3 = AVR EA (24-bit, page oriented)
+# P:4 = AVR DU (24-bit, word oriented)
+# P:5 = AVR EB (24-bit, page oriented)
+NVM_DRIVERS = {
+    '0': (NvmUpdiP0, UpdiDatalink16bit),
+    '2': (NvmUpdiP2, None),
+    '3': (NvmUpdiP3, None),
+    '4': (NvmUpdiP4, None),
+    '5': (NvmUpdiP5, None),
+}
+
+# Decoded SIB fields
+SibInfo = namedtuple('SibInfo', 'family NVM OCD OSC extra')
+
 
 def decode_sib(sib):
     """
@@ -22,8 +47,9 @@ def decode_sib(sib):
 
     :param sib: SIB data to decode
     :type sib: str
+    :returns: decoded SIB fields, or None if the SIB is not valid
+    :rtype: SibInfo
     """
-    sib_info = {}
     logger = getLogger(__name__)
 
     # Do some simple checks:
@@ -42,27 +68,22 @@ def decode_sib(sib):
     logger.info("SIB: '%s'", sib_string)
 
     # Parse fixed width fields according to spec
-    family = sib[0:7].strip().decode()
+    family = sib_string[0:7].strip()
     logger.info("Device family ID: '%s'", family)
-    sib_info['family'] = family
 
-    nvm = sib[8:11].strip().decode()
+    nvm = sib_string[8:11].strip()
     logger.info("NVM interface: '%s'", nvm)
-    sib_info['NVM'] = nvm.split(':')[1]
 
-    ocd = sib[11:14].strip().decode()
+    ocd = sib_string[11:14].strip()
     logger.info("Debug interface: '%s'", ocd)
-    sib_info['OCD'] = ocd.split(':')[1]
 
-    osc = sib[15:19].strip().decode()
+    osc = sib_string[15:19].strip()
     logger.info("PDI oscillator: '%s'", osc)
-    sib_info['OSC'] = osc
 
-    extra = sib[19:].strip().decode()
+    extra = sib_string[19:].strip()
     logger.info("Extra info: '%s'", extra)
-    sib_info['extra'] = extra
 
-    return sib_info
+    return SibInfo(family=family, NVM=nvm.partition(':')[2], OCD=ocd.partition(':')[2], OSC=osc, extra=extra)
 
 
 class UpdiApplication:
@@ -85,6 +106,8 @@ class UpdiApplication:
         # Build the UPDI stack:
         # Create a physical
         self.phy = UpdiPhysical(serialport, baud, timeout)
+        # Baud rate to return to when leaving programming mode
+        self.baud = self.phy.baud
 
         # Create a DL - use 24-bit until otherwise known
         datalink = UpdiDatalink24bit()
@@ -98,13 +121,21 @@ class UpdiApplication:
         # Create a read write access layer using this data link
         self.readwrite = UpdiReadWrite(datalink)
 
-        # Create an NVM driver
-        self.nvm = NvmUpdi(self.readwrite, self.device)
+        # The NVM driver is selected once the device has been identified
+        self.nvm = None
+
+        # Device info does not change while the session is active, so it is only read out once
+        self._sib_info = None
 
     def read_device_info(self):
         """
         Reads out device information from various sources
+
+        The result is cached until the device is unlocked or programming mode is left.
         """
+        if self._sib_info is not None:
+            return self._sib_info
+
         sib = self.readwrite.read_sib()
         sib_info = decode_sib(sib)
 
@@ -119,31 +150,17 @@ class UpdiApplication:
                 self.logger.error("Double-break recovery failed.  Unable to contact device.")
                 raise PymcuprogSerialUpdiError("Failed to read device info.")
 
-        # Select correct NVM driver:
-        # P:0 = tiny0, 1, 2; mega0 (16-bit, page oriented)
-        # P:1 = N/A
-        # P:2 = AVR DA, DB, DD (24-bit, word-oriented)
-        # P:3 = AVR EA (24-bit, page oriented)
-        # P:4 = AVR DU (24-bit, word oriented)
-        # P:5 = AVR EB (24-bit, page oriented)
-        if sib_info['NVM'] == '0':
-            # Original UPDI, switch to 16-bit DL
-            self.logger.info("NVM P:0")
-            datalink = UpdiDatalink16bit()
-            datalink.set_physical(self.phy)
-            datalink.init_datalink()
-            self.readwrite = UpdiReadWrite(datalink)
-            self.nvm = NvmUpdiP0(self.readwrite, self.device)
-        elif sib_info['NVM'] == '2':
-            self.logger.info("NVM P:2")
-            self.nvm = NvmUpdiP2(self.readwrite, self.device)
-        elif sib_info['NVM'] == '3':
-            self.logger.info("NVM P:3")
-            self.nvm = NvmUpdiP3(self.readwrite, self.device)
-        elif sib_info['NVM'] == '4':
-            self.nvm = NvmUpdiP4(self.readwrite, self.device)
-        elif sib_info['NVM'] == '5':
-            self.nvm = NvmUpdiP5(self.readwrite, self.device)
+        # Select correct NVM driver
+        if sib_info.NVM in NVM_DRIVERS:
+            self.logger.info("NVM P:%s", sib_info.NVM)
+            nvm_driver, datalink_class = NVM_DRIVERS[sib_info.NVM]
+            if datalink_class is not None:
+                # Original UPDI, switch to 16-bit DL.  The link itself has already been initialised, and its
+                # session parameters do not depend on the address width, so there is no need to do it again.
+                datalink = datalink_class()
+                datalink.set_physical(self.phy)
+                self.readwrite = UpdiReadWrite(datalink)
+            self.nvm = nvm_driver(self.readwrite, self.device)
         else:
             self.logger.error("Unsupported NVM revision - update pymcuprog.")
 
@@ -151,9 +168,11 @@ class UpdiApplication:
         if self.in_prog_mode():
             if self.device is not None:
                 devid = self.read_data(self.device.sigrow_address, 3)
-                devrev = self.read_data(self.device.syscfg_address + 1, 1)
+                # A single byte is read directly, without setting up the pointer
+                devrev = self.readwrite.read_byte(self.device.syscfg_address + 1)
                 self.logger.info("Device ID from serialupdi = '%02X%02X%02X' rev '%s'", devid[0], devid[1], devid[2],
-                                 chr(ord('A') + devrev[0]))
+                                 chr(ord('A') + devrev))
+        self._sib_info = sib_info
         return sib_info
 
     def read_data(self, address, size):
@@ -202,7 +221,7 @@ class UpdiApplication:
         :param data: data to write
         :type data: list of bytes
         """
-        return self.write_data(address, data)
+        return self.readwrite.write_data(address, data)
 
     def in_prog_mode(self):
         """
@@ -211,7 +230,7 @@ class UpdiApplication:
         :returns: True if in NVM PROG, False otherwise
         :rtype: bool
         """
-        if self.readwrite.read_cs(constants.UPDI_ASI_SYS_STATUS) & (1 << constants.UPDI_ASI_SYS_STATUS_NVMPROG):
+        if self.readwrite.read_cs(constants.UPDI_ASI_SYS_STATUS) & constants.UPDI_ASI_SYS_STATUS_NVMPROG_MASK:
             return True
         return False
 
@@ -225,12 +244,8 @@ class UpdiApplication:
         :returns: True if success, False otherwise
         :rtype: bool
         """
-        timeout = Timeout(timeout_ms)
-
-        while not timeout.expired():
-            if not self.readwrite.read_cs(constants.UPDI_ASI_SYS_STATUS) & (
-                    1 << constants.UPDI_ASI_SYS_STATUS_LOCKSTATUS):
-                return True
+        if self._wait_sys_status(timeout_ms, constants.UPDI_ASI_SYS_STATUS_LOCKSTATUS_MASK, wait_for_high=False):
+            return True
 
         self.logger.info("Timeout waiting for device to unlock")
         return False
@@ -247,18 +262,38 @@ class UpdiApplication:
         :returns: True if success, False otherwise
         :rtype: bool
         """
+        if self._wait_sys_status(timeout_ms, constants.UPDI_ASI_SYS_STATUS_UROWPROG_MASK, wait_for_high):
+            return True
+
+        self.logger.error("Timeout waiting for device to enter UROW write mode")
+        return False
+
+    def _wait_sys_status(self, timeout_ms, mask, wait_for_high):
+        """
+        Polls ASI_SYS_STATUS until the bits in mask are set or cleared
+
+        :param timeout_ms: number of milliseconds to wait
+        :type timeout_ms: int
+        :param mask: status bits to check
+        :type mask: int
+        :param wait_for_high: set True to wait for the bits to go high; False to wait for low
+        :type wait_for_high: bool
+        :returns: True if success, False if timeout occurred first
+        :rtype: bool
+        """
         timeout = Timeout(timeout_ms)
+        polls = 0
+        poll_delay = POLL_DELAY_MIN_S
 
         while not timeout.expired():
             status = self.readwrite.read_cs(constants.UPDI_ASI_SYS_STATUS)
-            if wait_for_high:
-                if status & (1 << constants.UPDI_ASI_SYS_STATUS_UROWPROG):
-                    return True
-            else:
-                if not status & (1 << constants.UPDI_ASI_SYS_STATUS_UROWPROG):
-                    return True
+            if bool(status & mask) == wait_for_high:
+                return True
+            polls += 1
+            if polls >= FAST_POLLS:
+                time.sleep(poll_delay)
+                poll_delay = min(poll_delay * 2, POLL_DELAY_MAX_S)
 
-        self.logger.error("Timeout waiting for device to enter UROW write mode")
         return False
 
 
@@ -268,19 +303,17 @@ class UpdiApplication:
 
         :raises: PymcuprogSerialUpdiError if an error occurs
         """
-        # Put in the key
-        self.readwrite.write_key(constants.UPDI_KEY_64, constants.UPDI_KEY_CHIPERASE)
+        self._sib_info = None
 
-        # Check key status
-        key_status = self.readwrite.read_cs(constants.UPDI_ASI_KEY_STATUS)
+        # Put in the key and check key status
+        key_status = self.readwrite.write_key_read_status(constants.UPDI_KEY_64, constants.UPDI_KEY_CHIPERASE)
         self.logger.debug("Key status = 0x%02X", key_status)
 
-        if not key_status & (1 << constants.UPDI_ASI_KEY_STATUS_CHIPERASE):
+        if not key_status & constants.UPDI_ASI_KEY_STATUS_CHIPERASE_MASK:
             raise PymcuprogSerialUpdiError("Key not accepted")
 
         # Toggle reset
-        self.reset(apply_reset=True)
-        self.reset(apply_reset=False)
+        self.toggle_reset()
 
         # And wait for unlock
         if not self.wait_unlocked(500):
@@ -296,19 +329,15 @@ class UpdiApplication:
         :type data: list of bytes
         :raises: PymcuprogSerialUpdiError if an error occurs
         """
-        # Put in the key
-        self.readwrite.write_key(constants.UPDI_KEY_64, constants.UPDI_KEY_UROW)
-
-        # Check key status
-        key_status = self.readwrite.read_cs(constants.UPDI_ASI_KEY_STATUS)
+        # Put in the key and check key status
+        key_status = self.readwrite.write_key_read_status(constants.UPDI_KEY_64, constants.UPDI_KEY_UROW)
         self.logger.debug("Key status = 0x%02X", key_status)
 
-        if not key_status & (1 << constants.UPDI_ASI_KEY_STATUS_UROWWRITE):
+        if not key_status & constants.UPDI_ASI_KEY_STATUS_UROWWRITE_MASK:
             raise PymcuprogSerialUpdiError("Key not accepted")
 
         # Toggle reset
-        self.reset(apply_reset=True)
-        self.reset(apply_reset=False)
+        self.toggle_reset()
 
         # Wait for mode to be entered
         if not self.wait_urow_prog(500, wait_for_high=True):
@@ -326,26 +355,29 @@ class UpdiApplication:
         # Wait for mode to be exited
         if not self.wait_urow_prog(500, wait_for_high=False):
             # Toggle reset
-            self.reset(apply_reset=True)
-            self.reset(apply_reset=False)
+            self.toggle_reset()
             raise PymcuprogSerialUpdiError("Failed to exit UROW write mode")
 
-        # Clear status
-        self.readwrite.write_cs(constants.UPDI_ASI_KEY_STATUS,
-                                (1 << constants.UPDI_ASI_KEY_STATUS_UROWWRITE) |
-                                (1 << constants.UPDI_CTRLB_CCDETDIS_BIT))
-
-        # Toggle reset
-        self.reset(apply_reset=True)
-        self.reset(apply_reset=False)
+        # Clear status and toggle reset
+        self.readwrite.write_cs_multiple([(constants.UPDI_ASI_KEY_STATUS,
+                                           constants.UPDI_ASI_KEY_STATUS_UROWWRITE_MASK |
+                                           (1 << constants.UPDI_CTRLB_CCDETDIS_BIT)),
+                                          (constants.UPDI_ASI_RESET_REQ, constants.UPDI_RESET_REQ_VALUE),
+                                          (constants.UPDI_ASI_RESET_REQ, 0x00)])
 
-    def enter_progmode(self):
+    def enter_progmode(self, boost_baud=None):
         """
         Enters into NVM programming mode
+
+        :param boost_baud: baud rate to switch to once in programming mode, None to keep using the session baud rate.
+            The session baud rate is restored by leave_progmode.
+        :type boost_baud: int
         """
         # First check if NVM is already enabled
         if self.in_prog_mode():
             self.logger.debug("Already in NVM programming mode")
+            if boost_baud:
+                self._boost_baud(boost_baud)
             return True
 
         self.logger.info("Entering NVM programming mode")
@@ -353,20 +385,16 @@ class UpdiApplication:
         # Hold part in reset
         self.reset(apply_reset=True)
 
-        # Put in the key
-        self.readwrite.write_key(constants.UPDI_KEY_64, constants.UPDI_KEY_NVM)
-
-        # Check key status
-        key_status = self.readwrite.read_cs(constants.UPDI_ASI_KEY_STATUS)
+        # Put in the key and check key status
+        key_status = self.readwrite.write_key_read_status(constants.UPDI_KEY_64, constants.UPDI_KEY_NVM)
         self.logger.debug("Key status = 0x%02X", key_status)
 
-        if not key_status & (1 << constants.UPDI_ASI_KEY_STATUS_NVMPROG):
+        if not key_status & constants.UPDI_ASI_KEY_STATUS_NVMPROG_MASK:
             self.logger.error("Key status = 0x%02X", key_status)
             raise PymcuprogSerialUpdiError("Key not accepted")
 
         # Toggle reset
-        self.reset(apply_reset=True)
-        self.reset(apply_reset=False)
+        self.toggle_reset()
 
         # And wait for unlock
         if not self.wait_unlocked(100):
@@ -377,17 +405,52 @@ class UpdiApplication:
             raise PymcuprogSerialUpdiError("Failed to enter NVM programming mode")
 
         self.logger.debug("Now in NVM programming mode")
+
+        if boost_baud:
+            self._boost_baud(boost_baud)
         return True
 
+    def _boost_baud(self, boost_baud):
+        """
+        Raises the UPDI clock and switches the serial port to the boost baud rate
+
+        UPDI synchronises to the baud rate on every instruction, so only the UPDI clock needs to be raised to support
+        the higher rate.
+
+        :param boost_baud: baud rate to switch to
+        :type boost_baud: int
+        :raises: PymcuprogSerialUpdiError if UPDI does not respond at the new baud rate, after restoring the default
+            UPDI clock and baud rate
+        """
+        if self.phy.baud == boost_baud:
+            return
+        self.logger.info("Switching to %d baud", boost_baud)
+        self.readwrite.write_cs(constants.UPDI_ASI_CTRLA, constants.UPDI_ASI_CTRLA_UPDICLKSEL_16M)
+        self.phy.change_baud(boost_baud)
+
+        # Check that UPDI is still there
+        try:
+            status = self.readwrite.read_cs(constants.UPDI_CS_STATUSA)
+        except PymcuprogSerialUpdiError:
+            status = 0
+        if not status:
+            # Go back to the default UPDI clock and baud rate so that the session can still be used or closed
+            self.phy.change_baud(self.baud)
+            self.readwrite.write_cs(constants.UPDI_ASI_CTRLA, constants.UPDI_ASI_CTRLA_UPDICLKSEL_4M)
+            raise PymcuprogSerialUpdiError("UPDI not responding at {} baud".format(boost_baud))
+
     def leave_progmode(self):
         """
         Disables UPDI which releases any keys enabled
         """
         self.logger.info("Leaving NVM programming mode")
-        self.reset(apply_reset=True)
-        self.reset(apply_reset=False)
+        self._sib_info = None
+        self.toggle_reset()
         self.readwrite.write_cs(constants.UPDI_CS_CTRLB,
                                 (1 << constants.UPDI_CTRLB_UPDIDIS_BIT) | (1 << constants.UPDI_CTRLB_CCDETDIS_BIT))
+        # Disabling UPDI restores its default clock, so the next session has to start at the session baud rate
+        if self.phy.baud != self.baud:
+            self.phy.change_baud(self.baud)
 
     def reset(self, apply_reset):
         """
@@ -396,9 +459,26 @@ class UpdiApplication:
         :param apply_reset: True to apply, False to release
         :type apply_reset: bool
         """
+        self._invalidate_nvm_ready()
         if apply_reset:
             self.logger.info("Apply reset")
             self.readwrite.write_cs(constants.UPDI_ASI_RESET_REQ, constants.UPDI_RESET_REQ_VALUE)
         else:
             self.logger.info("Release reset")
             self.readwrite.write_cs(constants.UPDI_ASI_RESET_REQ, 0x00)
+
+    def _invalidate_nvm_ready(self):
+        """
+        Makes the NVM driver wait for the NVM controller again, as a reset can leave it busy (eg: chip erase by key)
+        """
+        if self.nvm is not None:
+            self.nvm.invalidate_ready()
+
+    def toggle_reset(self):
+        """
+        Applies and then releases an UPDI reset condition, using a single serial transfer
+        """
+        self.logger.info("Toggle reset")
+        self._invalidate_nvm_ready()
+        self.readwrite.write_cs_multiple([(constants.UPDI_ASI_RESET_REQ, constants.UPDI_RESET_REQ_VALUE),
+                                          (constants.UPDI_ASI_RESET_REQ, 0x00)])
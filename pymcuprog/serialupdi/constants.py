@@ -43,6 +43,7 @@ UPDI_PHY_SYNC = 0x55
 UPDI_PHY_ACK = 0x40
 
 UPDI_MAX_REPEAT_SIZE = (0xFF+1) # Repeat counter of 1-byte, with off-by-one counting
+UPDI_MAX_REPEAT_WORDS = UPDI_MAX_REPEAT_SIZE >> 1
 
 # CS and ASI Register Address map
 UPDI_CS_STATUSA = 0x00
@@ -62,10 +63,19 @@ UPDI_CTRLA_RSD_BIT = 3
 UPDI_CTRLB_CCDETDIS_BIT = 3
 UPDI_CTRLB_UPDIDIS_BIT = 2
 
+# UPDI clock selection in ASI CTRLA, the 4MHz default limits the baud rate to about 225kbps
+UPDI_ASI_CTRLA_UPDICLKSEL_16M = 0x01
+UPDI_ASI_CTRLA_UPDICLKSEL_4M = 0x03
+
 UPDI_KEY_NVM = b"NVMProg "
 UPDI_KEY_CHIPERASE = b"NVMErase"
 UPDI_KEY_UROW = b"NVMUs&te"
 
+# Complete KEY instructions for the keys above, the key value is sent LSB first
+UPDI_KEY_FRAME_NVM = bytearray([UPDI_PHY_SYNC, UPDI_KEY | UPDI_KEY_KEY | UPDI_KEY_64]) + UPDI_KEY_NVM[::-1]
+UPDI_KEY_FRAME_CHIPERASE = bytearray([UPDI_PHY_SYNC, UPDI_KEY | UPDI_KEY_KEY | UPDI_KEY_64]) + UPDI_KEY_CHIPERASE[::-1]
+UPDI_KEY_FRAME_UROW = bytearray([UPDI_PHY_SYNC, UPDI_KEY | UPDI_KEY_KEY | UPDI_KEY_64]) + UPDI_KEY_UROW[::-1]
+
 UPDI_ASI_STATUSA_REVID = 4
 UPDI_ASI_STATUSB_PESIG = 0
 
@@ -73,12 +83,20 @@ UPDI_ASI_KEY_STATUS_CHIPERASE = 3
 UPDI_ASI_KEY_STATUS_NVMPROG = 4
 UPDI_ASI_KEY_STATUS_UROWWRITE = 5
 
+UPDI_ASI_KEY_STATUS_CHIPERASE_MASK = 1 << UPDI_ASI_KEY_STATUS_CHIPERASE
+UPDI_ASI_KEY_STATUS_NVMPROG_MASK = 1 << UPDI_ASI_KEY_STATUS_NVMPROG
+UPDI_ASI_KEY_STATUS_UROWWRITE_MASK = 1 << UPDI_ASI_KEY_STATUS_UROWWRITE
+
 UPDI_ASI_SYS_STATUS_RSTSYS = 5
 UPDI_ASI_SYS_STATUS_INSLEEP = 4
 UPDI_ASI_SYS_STATUS_NVMPROG = 3
 UPDI_ASI_SYS_STATUS_UROWPROG = 2
 UPDI_ASI_SYS_STATUS_LOCKSTATUS = 0
 
+UPDI_ASI_SYS_STATUS_NVMPROG_MASK = 1 << UPDI_ASI_SYS_STATUS_NVMPROG
+UPDI_ASI_SYS_STATUS_UROWPROG_MASK = 1 << UPDI_ASI_SYS_STATUS_UROWPROG
+UPDI_ASI_SYS_STATUS_LOCKSTATUS_MASK = 1 << UPDI_ASI_SYS_STATUS_LOCKSTATUS
+
 UPDI_ASI_SYS_CTRLA_UROW_FINAL = 1
 
 UPDI_RESET_REQ_VALUE = 0x59
@@ -14,6 +14,13 @@ class UpdiDatalink:
 
     LDCS_RESPONSE_BYTES = 1
 
+    # Prebuilt KEY instructions for the keys in use, indexed by (size, key)
+    KEY_COMMANDS = {
+        (constants.UPDI_KEY_64, constants.UPDI_KEY_NVM): constants.UPDI_KEY_FRAME_NVM,
+        (constants.UPDI_KEY_64, constants.UPDI_KEY_CHIPERASE): constants.UPDI_KEY_FRAME_CHIPERASE,
+        (constants.UPDI_KEY_64, constants.UPDI_KEY_UROW): constants.UPDI_KEY_FRAME_UROW,
+    }
+
     def __init__(self):
         self.logger = getLogger(__name__)
         self.updi_phy = None
@@ -39,15 +46,28 @@ class UpdiDatalink:
         Disables ACKs on write to reduce latency for writing blocks
         TODO: could read-modify-write
         """
-        self.stcs(constants.UPDI_CS_CTRLA, 1 << constants.UPDI_CTRLA_IBDLY_BIT |
-            1 << constants.UPDI_CTRLA_RSD_BIT)
+        self.updi_phy.send(self._ctrla_command(ack=False))
 
     def _enable_ack(self):
         """
         Enables ACKs on write by default
         TODO: could read-modify-write
         """
-        self.stcs(constants.UPDI_CS_CTRLA, 1 << constants.UPDI_CTRLA_IBDLY_BIT)
+        self.updi_phy.send(self._ctrla_command(ack=True))
+
+    def _ctrla_command(self, ack):
+        """
+        Builds an STCS instruction to CTRLA which sets the inter-byte delay and enables or disables ACKs
+
+        :param ack: True to enable ACKs, False to set RSD (Response Signature Disable)
+        :type ack: bool
+        :returns: STCS instruction
+        :rtype: list of bytes
+        """
+        ctrla = 1 << constants.UPDI_CTRLA_IBDLY_BIT
+        if not ack:
+            ctrla |= 1 << constants.UPDI_CTRLA_RSD_BIT
+        return [constants.UPDI_PHY_SYNC, constants.UPDI_STCS | constants.UPDI_CS_CTRLA, ctrla]
 
     def init_datalink(self):
         """
@@ -89,8 +109,8 @@ class UpdiDatalink:
         :type address: int
         """
         self.logger.debug("LDCS from 0x%02X", address)
-        self.updi_phy.send([constants.UPDI_PHY_SYNC, constants.UPDI_LDCS | (address & 0x0F)])
-        response = self.updi_phy.receive(self.LDCS_RESPONSE_BYTES)
+        response = self.updi_phy.send_receive([constants.UPDI_PHY_SYNC, constants.UPDI_LDCS | (address & 0x0F)],
+                                              self.LDCS_RESPONSE_BYTES)
         numbytes_received = len(response)
         if numbytes_received != self.LDCS_RESPONSE_BYTES:
             raise PymcuprogSerialUpdiProtocolError("Unexpected number of bytes in response: "
@@ -110,6 +130,21 @@ class UpdiDatalink:
         self.logger.debug("STCS to 0x%02X", address)
         self.updi_phy.send([constants.UPDI_PHY_SYNC, constants.UPDI_STCS | (address & 0x0F), value])
 
+    def stcs_multiple(self, writes):
+        """
+        Store a sequence of values to Control/Status space
+
+        STCS is not acknowledged, so all the instructions are sent in one go
+
+        :param writes: (address, value) pairs to write, in order
+        :type writes: list of tuples
+        """
+        command = []
+        for address, value in writes:
+            self.logger.debug("STCS to 0x%02X", address)
+            command += [constants.UPDI_PHY_SYNC, constants.UPDI_STCS | (address & 0x0F), value]
+        self.updi_phy.send(command)
+
     def ld_ptr_inc(self, size):
         """
         Loads a number of bytes from the pointer location with pointer post-increment
@@ -120,9 +155,8 @@ class UpdiDatalink:
         :rtype: list of bytes
         """
         self.logger.debug("LD8 from ptr++")
-        self.updi_phy.send([constants.UPDI_PHY_SYNC, constants.UPDI_LD | constants.UPDI_PTR_INC |
-                            constants.UPDI_DATA_8])
-        return self.updi_phy.receive(size)
+        return self.updi_phy.send_receive([constants.UPDI_PHY_SYNC, constants.UPDI_LD | constants.UPDI_PTR_INC |
+                                           constants.UPDI_DATA_8], size)
 
     def ld_ptr_inc16(self, words):
         """
@@ -134,75 +168,155 @@ class UpdiDatalink:
         :rtype: list of bytes
         """
         self.logger.debug("LD16 from ptr++")
-        self.updi_phy.send([constants.UPDI_PHY_SYNC, constants.UPDI_LD | constants.UPDI_PTR_INC |
-                            constants.UPDI_DATA_16])
-        return self.updi_phy.receive(words << 1)
+        return self.updi_phy.send_receive([constants.UPDI_PHY_SYNC, constants.UPDI_LD | constants.UPDI_PTR_INC |
+                                           constants.UPDI_DATA_16], words << 1)
 
-    def st_ptr_inc(self, data):
+    def _repeat_command(self, repeats):
         """
-        Store data to the pointer location with pointer post-increment
+        Builds a REPEAT instruction
+
+        :param repeats: number of repeats requested
+        :type repeats: int
+        :returns: REPEAT instruction
+        :rtype: list of bytes
+        """
+        if repeats < 1 or repeats > constants.UPDI_MAX_REPEAT_SIZE:
+            self.logger.error("Invalid repeat count of %d", repeats)
+            raise PymcuprogSerialUpdiProtocolError("Invalid repeat count!")
+        repeats -= 1
+        return [constants.UPDI_PHY_SYNC, constants.UPDI_REPEAT | constants.UPDI_REPEAT_BYTE, repeats & 0xFF]
+
+    def repeat(self, repeats):
+        """
+        Store a value to the repeat counter
+
+        Kept for compatibility: the repeat_* methods send the REPEAT in the same frame as the instruction it applies to
+
+        :param repeats: number of repeats requested
+        :type repeats: int
+        """
+        self.logger.debug("Repeat %d", repeats)
+        self.updi_phy.send(self._repeat_command(repeats))
+
+    def repeat_ld_ptr_inc(self, size):
+        """
+        Loads a number of bytes from the pointer location with pointer post-increment, repeated for all of the bytes
+
+        REPEAT has no response, so it is sent in the same frame as the load, and the whole block is read back in one go
+
+        :param size: number of bytes to load
+        :type size: int
+        :return: values read
+        :rtype: list of bytes
+        """
+        self.logger.debug("Repeat %d, LD8 from ptr++", size)
+        return self._load_block(self._repeat_command(size) +
+                                [constants.UPDI_PHY_SYNC, constants.UPDI_LD | constants.UPDI_PTR_INC |
+                                 constants.UPDI_DATA_8], size)
+
+    def repeat_ld_ptr_inc16(self, words):
+        """
+        Load 16-bit word values from the pointer location with pointer post-increment, repeated for all of the words
+
+        REPEAT has no response, so it is sent in the same frame as the load, and the whole block is read back in one go
+
+        :param words: number of words to load
+        :type words: int
+        :return: values read
+        :rtype: list of bytes
+        """
+        self.logger.debug("Repeat %d, LD16 from ptr++", words)
+        return self._load_block(self._repeat_command(words) +
+                                [constants.UPDI_PHY_SYNC, constants.UPDI_LD | constants.UPDI_PTR_INC |
+                                 constants.UPDI_DATA_16], words << 1)
+
+    def _load_block(self, command, size):
+        """
+        Sends a load instruction and receives the block of data it returns
+
+        :param command: load instruction(s) to send
+        :type command: list of bytes
+        :param size: number of bytes expected in the response
+        :type size: int
+        :return: values read
+        :rtype: bytearray
+        """
+        response = self.updi_phy.send_receive(command, size)
+        numbytes_received = len(response)
+        if numbytes_received != size:
+            raise PymcuprogSerialUpdiProtocolError("Unexpected number of bytes in response: "
+                                 "{} byte(s), expected {} byte(s)".format(numbytes_received, size))
+
+        return response
+
+    def repeat_st_ptr_inc(self, data):
+        """
+        Store data to the pointer location with pointer post-increment, repeated for all of the data
+
+        REPEAT has no response, so it is sent in the same frame as the start of the store.  Each byte is still
+        acknowledged, and the ACK is read back together with the echo.
 
         :param data: data to store
         :type data: list of bytes
         """
-        self.logger.debug("ST8 to *ptr++")
-        self.updi_phy.send([constants.UPDI_PHY_SYNC, constants.UPDI_ST | constants.UPDI_PTR_INC | constants.UPDI_DATA_8,
-                            data[0]])
-        response = self.updi_phy.receive(1)
-
+        self.logger.debug("Repeat %d, ST8 to *ptr++", len(data))
+        response = self.updi_phy.send_receive(self._repeat_command(len(data)) +
+                                              [constants.UPDI_PHY_SYNC, constants.UPDI_ST | constants.UPDI_PTR_INC |
+                                               constants.UPDI_DATA_8, data[0]], 1)
         if len(response) != 1 or response[0] != constants.UPDI_PHY_ACK:
             raise PymcuprogSerialUpdiProtocolError("ACK error with st_ptr_inc")
 
         num = 1
         while num < len(data):
-            self.updi_phy.send([data[num]])
-            response = self.updi_phy.receive(1)
+            response = self.updi_phy.send_receive([data[num]], 1)
 
             if len(response) != 1 or response[0] != constants.UPDI_PHY_ACK:
                 raise PymcuprogSerialUpdiProtocolError("Error with st_ptr_inc")
             num += 1
 
-    def st_ptr_inc16(self, data):
+    def st_ptr_inc(self, data):
         """
-        Store a 16-bit word value to the pointer location with pointer post-increment.
-        ACK is disabled for blocks (> 2 bytes)
+        Store data to the pointer location with pointer post-increment
+
+        Kept for compatibility: the store is sent with its own REPEAT by repeat_st_ptr_inc, so any repeat count set
+        beforehand is replaced by the length of the data
 
         :param data: data to store
         :type data: list of bytes
         """
-        self.logger.debug("ST16 to *ptr++")
-        if len(data) == 2:
-            # ACKed mode used for 2-byte transfers
-            self.logger.debug("ACKed block write")
-            self.updi_phy.send([constants.UPDI_PHY_SYNC, constants.UPDI_ST | constants.UPDI_PTR_INC |
-                                constants.UPDI_DATA_16, data[0], data[1]])
-            response = self.updi_phy.receive(1)
+        self.repeat_st_ptr_inc(data)
 
-            if len(response) != 1 or response[0] != constants.UPDI_PHY_ACK:
-                raise PymcuprogSerialUpdiProtocolError("ACK error with st_ptr_inc16")
-        else:
-            self.logger.debug("ACKless block write")
-            self._disable_ack()
-            self.updi_phy.send([constants.UPDI_PHY_SYNC, constants.UPDI_ST | constants.UPDI_PTR_INC |
-                            constants.UPDI_DATA_16])
-            # Send data with no ACK (Response Signature)
-            self.updi_phy.send(data)
-            self._enable_ack()
+    def st_ptr_inc16(self, data):
+        """
+        Store 16-bit word values to the pointer location with pointer post-increment
 
-    def repeat(self, repeats):
+        Kept for compatibility: the store is sent with its own REPEAT by repeat_st_ptr_inc16, so any repeat count set
+        beforehand is replaced by the number of words in the data
+
+        :param data: data to store
+        :type data: list of bytes
         """
-        Store a value to the repeat counter
+        self.repeat_st_ptr_inc16(data)
 
-        :param repeats: number of repeats requested
-        :type repeats: int
+    def repeat_st_ptr_inc16(self, data):
         """
-        self.logger.debug("Repeat %d", repeats)
-        if (repeats - 1) > constants.UPDI_MAX_REPEAT_SIZE:
-            self.logger.error("Invalid repeat count of %d", repeats)
-            raise PymcuprogSerialUpdiProtocolError("Invalid repeat count!")
-        repeats -= 1
-        self.updi_phy.send([constants.UPDI_PHY_SYNC, constants.UPDI_REPEAT | constants.UPDI_REPEAT_BYTE,
-                            repeats & 0xFF])
+        Store 16-bit words to the pointer location with pointer post-increment, repeated for all of the data
+
+        ACKs are disabled for the block, so enabling RSD, the REPEAT, the store, the data and disabling RSD again are
+        all sent in one frame.
+
+        :param data: data to store
+        :type data: list of bytes
+        """
+        self.logger.debug("Repeat %d, ACKless ST16 to *ptr++", len(data) >> 1)
+        command = bytearray(self._ctrla_command(ack=False) +
+                            self._repeat_command(len(data) >> 1) +
+                            [constants.UPDI_PHY_SYNC, constants.UPDI_ST | constants.UPDI_PTR_INC |
+                             constants.UPDI_DATA_16])
+        # The data is already in little-endian word order, so it is copied into the frame as it is
+        command.extend(data)
+        command.extend(self._ctrla_command(ack=True))
+        self.updi_phy.send(command)
 
     def read_sib(self):
         """
@@ -213,6 +327,49 @@ class UpdiDatalink:
         """
         return self.updi_phy.sib()
 
+    def key_ldcs(self, size, key, address):
+        """
+        Write a key and load data from Control/Status space
+
+        KEY is not acknowledged, so the key and the LDCS are sent in one go
+
+        :param size: size of key (0=64B, 1=128B, 2=256B)
+        :type size: int
+        :param key: key value
+        :type key: list of bytes
+        :param address: address to load
+        :type address: int
+        """
+        self.logger.debug("Writing key and LDCS from 0x%02X", address)
+        command = self._key_command(size, key) + bytearray([constants.UPDI_PHY_SYNC,
+                                                            constants.UPDI_LDCS | (address & 0x0F)])
+        response = self.updi_phy.send_receive(command, self.LDCS_RESPONSE_BYTES)
+        numbytes_received = len(response)
+        if numbytes_received != self.LDCS_RESPONSE_BYTES:
+            raise PymcuprogSerialUpdiProtocolError("Unexpected number of bytes in response: "
+                                 "{} byte(s), expected {} byte(s)".format(numbytes_received, self.LDCS_RESPONSE_BYTES))
+
+        return response[0]
+
+    def _key_command(self, size, key):
+        """
+        Builds a KEY instruction including the key value
+
+        :param size: size of key (0=64B, 1=128B, 2=256B)
+        :type size: int
+        :param key: key value
+        :type key: list of bytes
+        :returns: KEY instruction
+        :rtype: bytearray
+        """
+        key = bytes(bytearray(key))
+        command = self.KEY_COMMANDS.get((size, key))
+        if command is not None:
+            return command
+        if len(key) != 8 << size:
+            raise PymcuprogSerialUpdiProtocolError("Invalid KEY length!")
+        return bytearray([constants.UPDI_PHY_SYNC, constants.UPDI_KEY | constants.UPDI_KEY_KEY | size]) + key[::-1]
+
     def key(self, size, key):
         """
         Write a key
@@ -223,10 +380,37 @@ class UpdiDatalink:
         :type key: list of bytes
         """
         self.logger.debug("Writing key")
-        if len(key) != 8 << size:
-            raise PymcuprogSerialUpdiProtocolError("Invalid KEY length!")
-        self.updi_phy.send([constants.UPDI_PHY_SYNC, constants.UPDI_KEY | constants.UPDI_KEY_KEY | size])
-        self.updi_phy.send(list(reversed(list(key))))
+        self.updi_phy.send(self._key_command(size, key))
+
+    def st_noack(self, address, value):
+        """
+        Store a single byte value directly to an address without ACK
+
+        ACKs are disabled around the store so that the whole sequence can be sent in one go.  Errors are not detected,
+        so this is only used for writes which are not critical, like clearing a command.
+
+        :param address: address to write to
+        :type address: int
+        :param value: value to write
+        :type value: byte
+        """
+        self.logger.debug("ACKless ST to 0x%06X", address)
+        self.updi_phy.send(self._ctrla_command(ack=False) +
+                           self._sts_command(address, constants.UPDI_DATA_8) + [value & 0xFF] +
+                           self._ctrla_command(ack=True))
+
+    def _sts_command(self, address, data_size):
+        """
+        Builds the address phase of an STS instruction
+
+        :param address: address to write to
+        :type address: int
+        :param data_size: UPDI_DATA_8 or UPDI_DATA_16
+        :type data_size: int
+        :returns: STS instruction up to and including the address
+        :rtype: list of bytes
+        """
+        raise NotImplementedError("Datalink address size not known")
 
     def _st_data_phase(self, values):
         """
@@ -319,6 +503,20 @@ class UpdiDatalink16bit(UpdiDatalink):
              address & 0xFF, (address >> 8) & 0xFF])
         return self._st_data_phase([value & 0xFF, (value >> 8) & 0xFF])
 
+    def _sts_command(self, address, data_size):
+        """
+        Builds the address phase of an STS instruction with a 16-bit address
+
+        :param address: address to write to
+        :type address: int
+        :param data_size: UPDI_DATA_8 or UPDI_DATA_16
+        :type data_size: int
+        :returns: STS instruction up to and including the address
+        :rtype: list of bytes
+        """
+        return [constants.UPDI_PHY_SYNC, constants.UPDI_STS | constants.UPDI_ADDRESS_16 | data_size,
+                address & 0xFF, (address >> 8) & 0xFF]
+
     def st_ptr(self, address):
         """
         Set the pointer location
@@ -407,6 +605,20 @@ class UpdiDatalink24bit(UpdiDatalink):
              address & 0xFF, (address >> 8) & 0xFF, (address >> 16) & 0xFF])
         return self._st_data_phase([value & 0xFF, (value >> 8) & 0xFF])
 
+    def _sts_command(self, address, data_size):
+        """
+        Builds the address phase of an STS instruction with a 24-bit address
+
+        :param address: address to write to
+        :type address: int
+        :param data_size: UPDI_DATA_8 or UPDI_DATA_16
+        :type data_size: int
+        :returns: STS instruction up to and including the address
+        :rtype: list of bytes
+        """
+        return [constants.UPDI_PHY_SYNC, constants.UPDI_STS | constants.UPDI_ADDRESS_24 | data_size,
+                address & 0xFF, (address >> 8) & 0xFF, (address >> 16) & 0xFF]
+
     def st_ptr(self, address):
         """
         Set the pointer location
@@ -1,16 +1,125 @@
 """
 NVM implementations on various UPDI device families
 """
+import time
 from logging import getLogger
+from .timeout import monotonic
+from ..pymcuprog_errors import PymcuprogSerialUpdiNvmError, PymcuprogSerialUpdiNvmTimeout
 
 class NvmUpdi(object):
     """
     Base class for NVM
     """
+    __slots__ = ('logger', 'readwrite', 'device', 'ctrla_address', 'status_address', '_ready')
+
+    # Number of back to back status polls while waiting for the NVM controller, after which the polls are spaced out
+    # starting at POLL_DELAY_MIN_S and doubling up to POLL_DELAY_MAX_S.  Short operations like page writes complete
+    # within the fast polls, long ones like chip erase do not flood the link with status reads.
+    FAST_POLLS = 32
+    POLL_DELAY_MIN_S = 0.0005
+    POLL_DELAY_MAX_S = 0.01
+
+    # NVM CTRL register offsets, defined by each NVM version
+    NVMCTRL_CTRLA = 0x00
+    NVMCTRL_STATUS = 0x00
+
+    # CTRLA command which removes the current command from the NVM controller
+    NVMCMD_NOCMD = 0x00
+
+    # STATUS register bits, defined by each NVM version
+    STATUS_WRITE_ERROR_bm = 0
+    STATUS_WRITE_ERROR_bp = 0
+    STATUS_BUSY_bm = 0
+
     def __init__(self, readwrite, device):
         self.logger = getLogger(__name__)
         self.readwrite = readwrite
         self.device = device
+        # Absolute addresses of the NVM CTRL registers used by every operation
+        self.ctrla_address = device.nvmctrl_address + self.NVMCTRL_CTRLA
+        self.status_address = device.nvmctrl_address + self.NVMCTRL_STATUS
+        # Set when the last wait found the NVM controller ready and no command has been executed since
+        self._ready = False
+
+    def _ensure_ready(self):
+        """
+        Waits for the NVM controller to be ready, unless it is already known to be
+
+        :returns: True if 'ready', False if timeout occurred before ready
+        :rtype: bool
+        """
+        if self._ready:
+            return True
+        return self.wait_nvm_ready()
+
+    def invalidate_ready(self):
+        """
+        Forgets that the NVM controller is ready, so that the next operation waits for it again
+
+        Used when the device state may have changed behind the driver, like on reset or leaving programming mode
+        """
+        self._ready = False
+
+    def wait_nvm_ready(self, timeout_ms=100):
+        """
+        Waits for the NVM controller to be ready
+
+        The STATUS register is polled at status_address, using the STATUS_WRITE_ERROR_bm/bp and STATUS_BUSY_bm
+        definitions of the NVM version.
+
+        :param timeout_ms: Timeout period in milliseconds
+        :type timeout_ms: int, defaults to 100
+        :returns: True if 'ready', False if timeout occurred before ready
+        :rtype: bool
+        :raises: PymcuprogSerialUpdiNvmError if an error condition is encountered
+        """
+        deadline = monotonic() + timeout_ms / 1000.0
+        read_byte = self.readwrite.read_byte
+        status_address = self.status_address
+        polls = 0
+        poll_delay = self.POLL_DELAY_MIN_S
+
+        self.logger.debug("Wait NVM ready")
+        self._ready = False
+        while monotonic() < deadline:
+            status = read_byte(status_address)
+            if status & self.STATUS_WRITE_ERROR_bm:
+                error = (status & self.STATUS_WRITE_ERROR_bm) >> self.STATUS_WRITE_ERROR_bp
+                self.logger.error("NVM error (%d)", error)
+                raise PymcuprogSerialUpdiNvmError(msg="NVM error", code=error)
+
+            if not status & self.STATUS_BUSY_bm:
+                self._ready = True
+                return True
+
+            polls += 1
+            if polls >= self.FAST_POLLS:
+                time.sleep(poll_delay)
+                poll_delay = min(poll_delay * 2, self.POLL_DELAY_MAX_S)
+
+        self.logger.error("Wait NVM ready timed out")
+        return False
+
+    def clear_nvm_command(self):
+        """
+        Removes the command from the NVM CTRL
+
+        This is done once the controller is ready, so the write is not acknowledged to save round trips on the link
+        """
+        self.logger.debug("Clear NVM command")
+        return self.readwrite.write_byte_noack(self.ctrla_address, self.NVMCMD_NOCMD)
+
+    def execute_nvm_command(self, command):
+        """
+        Executes an NVM COMMAND on the NVM CTRL
+
+        :param command: command to execute
+        :type param: int
+        """
+        self.logger.debug("NVMCMD %d executing", command)
+        # The command may keep the controller busy, so the next operation has to wait for it
+        self._ready = False
+        return self.readwrite.write_byte(self.ctrla_address, command)
 
     def chip_erase(self):
         """
@@ -53,6 +162,45 @@ class NvmUpdi(object):
         """
         raise NotImplementedError("NVM stack not ready")
 
+    def write_flash_begin(self):
+        """
+        Prepares for writing flash in a sequence of write_flash_chunk calls
+
+        Drivers which can keep the NVM controller set up between chunks override this, by default nothing is done
+        """
+
+    def write_flash_chunk(self, address, data):
+        """
+        Writes one chunk of data to flash, between write_flash_begin and write_flash_end
+
+        :param address: address to write to
+        :param data: data to write
+        """
+        return self.write_flash(address, data)
+
+    def write_flash_end(self):
+        """
+        Finishes writing flash after a sequence of write_flash_chunk calls
+        """
+
+    def write_flash_pages(self, pages):
+        """
+        Writes a sequence of pages to flash
+
+        The NVM controller is set up once for the whole sequence using write_flash_begin, write_flash_chunk and
+        write_flash_end
+
+        :param pages: (address, data) pairs to write, in order
+        :type pages: iterable of tuples
+        """
+        self.write_flash_begin()
+        try:
+            for address, data in pages:
+                self.logger.debug("Writing %d bytes to flash address 0x%06X", len(data), address)
+                self.write_flash_chunk(address, data)
+        finally:
+            self.write_flash_end()
+
     def write_user_row(self, address, data):
         """
         Writes data to user row
@@ -79,3 +227,53 @@ class NvmUpdi(object):
         :param data: data to write
         """
         raise NotImplementedError("NVM stack not ready")
+
+
+class NvmUpdiDirectFlashWriteMixin(object):
+    """
+    Flash write sequence for NVM versions without a page buffer (P:2 and P:4)
+
+    Flash is written directly, so the chunks can all be written under one write command
+    """
+    __slots__ = ()
+
+    def write_flash_begin(self):
+        """
+        Prepares for writing flash in a sequence of write_flash_chunk calls
+
+        The write command (NVMCMD_FLASH_WRITE) is set once and kept in the NVM controller until write_flash_end is
+        called.
+
+        :raises: PymcuprogSerialUpdiNvmTimeout if a timeout occurred
+        """
+        # Check that NVM controller is ready
+        if not self._ensure_ready():
+            raise PymcuprogSerialUpdiNvmTimeout("Timeout waiting for NVM controller to be ready before flash write")
+
+        # Write the command to the NVM controller
+        self.logger.debug("NVM write command")
+        self.execute_nvm_command(self.NVMCMD_FLASH_WRITE)
+
+    def write_flash_chunk(self, address, data):
+        """
+        Writes one chunk of data to flash, between write_flash_begin and write_flash_end
+
+        :param address: address to write to
+        :type address: int
+        :param data: data to write
+        :type data: list of bytes
+        :raises: PymcuprogSerialUpdiNvmTimeout if a timeout occurred
+        :raises: PymcuprogSerialUpdiNvmError if an error condition is encountered
+        """
+        self.readwrite.write_data_words(address, data)
+
+        # Wait for NVM controller to be ready again
+        if not self.wait_nvm_ready():
+            raise PymcuprogSerialUpdiNvmTimeout("Timeout waiting for NVM controller to be ready after data write")
+
+    def write_flash_end(self):
+        """
+        Finishes writing flash after a sequence of write_flash_chunk calls
+        """
+        # Remove command from NVM controller
+        self.clear_nvm_command()
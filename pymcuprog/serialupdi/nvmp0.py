@@ -5,13 +5,13 @@ Present on tiny0, 1, 2 and mega0 (eg: tiny817 -> mega4809)
 """
 from logging import getLogger
 from .nvm import NvmUpdi
-from .timeout import Timeout
-from ..pymcuprog_errors import PymcuprogSerialUpdiNvmTimeout, PymcuprogSerialUpdiNvmError
+from ..pymcuprog_errors import PymcuprogSerialUpdiNvmTimeout
 
 class NvmUpdiP0(NvmUpdi):
     """
     Version P:0 UPDI NVM properties
     """
+    __slots__ = ()
 
     # NVM CTRL peripheral definition
     NVMCTRL_CTRLA = 0x00
@@ -34,8 +34,10 @@ class NvmUpdiP0(NvmUpdi):
 
     # STATUS
     STATUS_WRITE_ERROR_bp = 2
+    STATUS_WRITE_ERROR_bm = 1 << STATUS_WRITE_ERROR_bp
     STATUS_EEPROM_BUSY_bp = 1
     STATUS_FLASH_BUSY_bp = 0
+    STATUS_BUSY_bm = (1 << STATUS_EEPROM_BUSY_bp) | (1 << STATUS_FLASH_BUSY_bp)
 
     def __init__(self, readwrite, device):
         NvmUpdi.__init__(self, readwrite, device)
@@ -50,7 +52,7 @@ class NvmUpdiP0(NvmUpdi):
         self.logger.debug("Chip erase using NVM CTRL")
 
         # Wait until NVM CTRL is ready to erase
-        if not self.wait_nvm_ready():
+        if not self._ensure_ready():
             raise PymcuprogSerialUpdiNvmTimeout("Timeout waiting for NVM controller to be ready before chip erase")
 
         # Erase
@@ -71,11 +73,11 @@ class NvmUpdiP0(NvmUpdi):
         self.logger.debug("Erase flash page at address 0x%08X", address)
 
         # Wait until NVM CTRL is ready to erase
-        if not self.wait_nvm_ready():
+        if not self._ensure_ready():
             raise PymcuprogSerialUpdiNvmTimeout("Timeout waiting for NVM controller to be ready before flash page erase")
 
         # Dummy write
-        self.readwrite.write_data(address, [0xFF])
+        self.readwrite.write_byte(address, 0xFF)
 
         # Erase
         self.execute_nvm_command(self.NVMCMD_ERASE_PAGE)
@@ -91,7 +93,7 @@ class NvmUpdiP0(NvmUpdi):
         self.logger.debug("Erase EEPROM")
 
         # Wait until NVM CTRL is ready to erase
-        if not self.wait_nvm_ready():
+        if not self._ensure_ready():
             raise PymcuprogSerialUpdiNvmTimeout("Timeout waiting for NVM controller to be ready before EEPROM erase")
 
         # Erase
@@ -113,13 +115,12 @@ class NvmUpdiP0(NvmUpdi):
         self.logger.debug("Erase user row")
 
         # Wait until NVM CTRL is ready to erase
-        if not self.wait_nvm_ready():
+        if not self._ensure_ready():
             raise PymcuprogSerialUpdiNvmTimeout("Timeout waiting for NVM controller to be ready before user row erase")
 
         # On this NVM version user row is implemented as EEPROM
         # When erasing single EEPROM pages a dummy write is needed for each location to be erased
-        for offset in range(size):
-            self.readwrite.write_data(address+offset, [0xFF])
+        self.readwrite.write_data(address, bytearray([0xFF]) * size)
 
         # Erase
         self.execute_nvm_command(self.NVMCMD_ERASE_PAGE)
@@ -174,13 +175,14 @@ class NvmUpdiP0(NvmUpdi):
         """
 
         # Check that NVM controller is ready
-        if not self.wait_nvm_ready():
+        if not self._ensure_ready():
             raise PymcuprogSerialUpdiNvmTimeout("Timeout waiting for NVM controller to be ready before fuse write")
 
-        # Write address to NVMCTRL ADDR
+        # Write address to NVMCTRL ADDR, both bytes in one 16-bit store.
+        # The stores are acknowledged, a corrupted address or value must not go unnoticed when writing fuses.
         self.logger.debug("Load NVM address")
-        self.readwrite.write_byte(self.device.nvmctrl_address + self.NVMCTRL_ADDR, address & 0xFF)
-        self.readwrite.write_byte(self.device.nvmctrl_address + self.NVMCTRL_ADDR+1, (address >> 8) & 0xFF)
+        self.readwrite.write_data_words(self.device.nvmctrl_address + self.NVMCTRL_ADDR,
+                                        [address & 0xFF, (address >> 8) & 0xFF])
 
         # Write data
         self.logger.debug("Load fuse data")
@@ -213,7 +215,7 @@ class NvmUpdiP0(NvmUpdi):
         """
 
         # Check that NVM controller is ready
-        if not self.wait_nvm_ready():
+        if not self._ensure_ready():
             raise PymcuprogSerialUpdiNvmTimeout("Timeout waiting for NVM controller to be ready before page buffer clear")
 
         # Clear the page buffer
@@ -237,38 +239,3 @@ class NvmUpdiP0(NvmUpdi):
         # Wait for NVM controller to be ready again
         if not self.wait_nvm_ready():
             raise PymcuprogSerialUpdiNvmTimeout("Timeout waiting for NVM controller to be ready after page write")
-
-    def wait_nvm_ready(self, timeout_ms=100):
-        """
-        Waits for the NVM controller to be ready
-
-        :param timeout_ms: Timeout period in milliseconds
-        :type timeout_ms: int, defaults to 100
-        :returns: True if 'ready', False if timeout occurred before ready
-        :rtype: bool
-        :raises: PymcuprogSerialUpdiNvmError if an error condition is encountered
-        """
-        timeout = Timeout(timeout_ms)
-
-        self.logger.debug("Wait NVM ready")
-        while not timeout.expired():
-            status = self.readwrite.read_byte(self.device.nvmctrl_address + self.NVMCTRL_STATUS)
-            if status & (1 << self.STATUS_WRITE_ERROR_bp):
-                self.logger.error("NVM error")
-                raise PymcuprogSerialUpdiNvmError(msg="NVM error", code=1)
-
-            if not status & ((1 << self.STATUS_EEPROM_BUSY_bp) | (1 << self.STATUS_FLASH_BUSY_bp)):
-                return True
-
-        self.logger.error("Wait NVM ready timed out")
-        return False
-
-    def execute_nvm_command(self, command):
-        """
-        Executes an NVM COMMAND on the NVM CTRL
-
-        :param command: command to execute
-        :type param: int
-        """
-        self.logger.debug("NVMCMD %d executing", command)
-        return self.readwrite.write_byte(self.device.nvmctrl_address + self.NVMCTRL_CTRLA, command)
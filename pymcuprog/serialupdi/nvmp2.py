@@ -4,14 +4,14 @@ NVM controller implementation for P:2.
 Present on, for example, AVR DA, DB, DD
 """
 from logging import getLogger
-from .nvm import NvmUpdi
-from .timeout import Timeout
-from ..pymcuprog_errors import PymcuprogSerialUpdiNvmTimeout, PymcuprogSerialUpdiNvmError
+from .nvm import NvmUpdi, NvmUpdiDirectFlashWriteMixin
+from ..pymcuprog_errors import PymcuprogSerialUpdiNvmTimeout
 
-class NvmUpdiP2(NvmUpdi):
+class NvmUpdiP2(NvmUpdiDirectFlashWriteMixin, NvmUpdi):
     """
     Version P:2 UPDI NVM properties
     """
+    __slots__ = ()
 
     # NVM CTRL peripheral definition
     NVMCTRL_CTRLA = 0x00
@@ -38,6 +38,7 @@ class NvmUpdiP2(NvmUpdi):
     STATUS_WRITE_ERROR_bp = 4
     STATUS_EEPROM_BUSY_bp = 1
     STATUS_FLASH_BUSY_bp = 0
+    STATUS_BUSY_bm = (1 << STATUS_EEPROM_BUSY_bp) | (1 << STATUS_FLASH_BUSY_bp)
 
     def __init__(self, readwrite, device):
         NvmUpdi.__init__(self, readwrite, device)
@@ -52,7 +53,7 @@ class NvmUpdiP2(NvmUpdi):
         self.logger.debug("Chip erase using NVM CTRL")
 
         # Wait until NVM CTRL is ready to erase
-        if not self.wait_nvm_ready():
+        if not self._ensure_ready():
             raise PymcuprogSerialUpdiNvmTimeout("Timeout waiting for NVM controller to be ready before chip erase")
 
         # Erase
@@ -62,8 +63,7 @@ class NvmUpdiP2(NvmUpdi):
         status = self.wait_nvm_ready()
 
         # Remove command from NVM controller
-        self.logger.debug("Clear NVM command")
-        self.execute_nvm_command(self.NVMCMD_NOCMD)
+        self.clear_nvm_command()
         if not status:
             raise PymcuprogSerialUpdiNvmTimeout("Timeout waiting for NVM controller to be ready after chip erase")
 
@@ -78,21 +78,20 @@ class NvmUpdiP2(NvmUpdi):
         self.logger.debug("Erase flash page at address 0x%08X", address)
 
         # Wait until NVM CTRL is ready to erase
-        if not self.wait_nvm_ready():
+        if not self._ensure_ready():
             raise PymcuprogSerialUpdiNvmTimeout("Timeout waiting for NVM controller to be ready before flash page erase")
 
         # Erase command
         self.execute_nvm_command(self.NVMCMD_FLASH_PAGE_ERASE)
 
         # Dummy write
-        self.readwrite.write_data(address, [0xFF])
+        self.readwrite.write_byte(address, 0xFF)
 
         # And wait for it
         status = self.wait_nvm_ready()
 
         # Remove command from NVM controller
-        self.logger.debug("Clear NVM command")
-        self.execute_nvm_command(self.NVMCMD_NOCMD)
+        self.clear_nvm_command()
         if not status:
             raise PymcuprogSerialUpdiNvmTimeout("Timeout waiting for NVM controller to be ready after flash page erase")
 
@@ -103,7 +102,7 @@ class NvmUpdiP2(NvmUpdi):
         self.logger.debug("Erase EEPROM")
 
         # Wait until NVM CTRL is ready to erase
-        if not self.wait_nvm_ready():
+        if not self._ensure_ready():
             raise PymcuprogSerialUpdiNvmTimeout("Timeout waiting for NVM controller to be ready before EEPROM erase")
 
         # Erase
@@ -113,8 +112,7 @@ class NvmUpdiP2(NvmUpdi):
         status = self.wait_nvm_ready()
 
         # Remove command from NVM controller
-        self.logger.debug("Clear NVM command")
-        self.execute_nvm_command(self.NVMCMD_NOCMD)
+        self.clear_nvm_command()
         if not status:
             raise PymcuprogSerialUpdiNvmTimeout("Timeout waiting for NVM controller to be ready after EEPROM erase")
 
@@ -152,13 +150,21 @@ class NvmUpdiP2(NvmUpdi):
         :param data: data to write
         :type data: list of bytes
         """
-        # On this NVM variant user row is implemented as Flash
-        return self.write_nvm(address, data, use_word_access=False)
+        # On this NVM variant user row is implemented as Flash, so it can be written a word at a time.
+        # A trailing odd byte is written on its own so that nothing is written past the end of the data.
+        words_size = len(data) & ~1
+        if words_size:
+            self.write_nvm(address, data[:words_size], use_word_access=True)
+        if len(data) > words_size:
+            self.write_nvm(address + words_size, data[words_size:], use_word_access=False)
 
     def write_eeprom(self, address, data):
         """
         Writes data to NVM (EEPROM)
 
+        The erase/write command is set once for all of the data, so writing a whole EEPROM page (or more) in one call
+        is much cheaper than writing it a few bytes at a time.
+
         :param address: address to write to
         :type address: int
         :param data: data to write
@@ -167,7 +173,7 @@ class NvmUpdiP2(NvmUpdi):
         nvm_command = self.NVMCMD_EEPROM_ERASE_WRITE
 
         # Check that NVM controller is ready
-        if not self.wait_nvm_ready():
+        if not self._ensure_ready():
             raise PymcuprogSerialUpdiNvmTimeout("Timeout waiting for NVM ready before command write")
 
         # Write the command to the NVM controller
@@ -181,8 +187,7 @@ class NvmUpdiP2(NvmUpdi):
         status = self.wait_nvm_ready()
 
         # Remove command from NVM controller
-        self.logger.debug("Clear NVM command")
-        self.execute_nvm_command(self.NVMCMD_NOCMD)
+        self.clear_nvm_command()
         if not status:
             raise PymcuprogSerialUpdiNvmTimeout("Timeout waiting for NVM ready after data write")
 
@@ -216,7 +221,7 @@ class NvmUpdiP2(NvmUpdi):
         nvm_command = self.NVMCMD_FLASH_WRITE
 
         # Check that NVM controller is ready
-        if not self.wait_nvm_ready():
+        if not self._ensure_ready():
             raise PymcuprogSerialUpdiNvmTimeout("Timeout waiting for NVM controller to be ready before page buffer clear")
 
         # Write the command to the NVM controller
@@ -233,42 +238,6 @@ class NvmUpdiP2(NvmUpdi):
         status = self.wait_nvm_ready()
 
         # Remove command from NVM controller
-        self.logger.debug("Clear NVM command")
-        self.execute_nvm_command(self.NVMCMD_NOCMD)
+        self.clear_nvm_command()
         if not status:
             raise PymcuprogSerialUpdiNvmTimeout("Timeout waiting for NVM controller to be ready after data write")
-
-    def wait_nvm_ready(self, timeout_ms=100):
-        """
-        Waits for the NVM controller to be ready
-
-        :param timeout_ms: Timeout period in milliseconds
-        :type timeout_ms: int, defaults to 100
-        :returns: True if 'ready', False if timeout occurred before ready
-        :rtype: bool
-        :raises: PymcuprogSerialUpdiNvmError if an error condition is encountered
-        """
-        timeout = Timeout(timeout_ms)
-
-        self.logger.debug("Wait NVM ready")
-        while not timeout.expired():
-            status = self.readwrite.read_byte(self.device.nvmctrl_address + self.NVMCTRL_STATUS)
-            if status & self.STATUS_WRITE_ERROR_bm:
-                self.logger.error("NVM error (%d)", status >> self.STATUS_WRITE_ERROR_bp)
-                raise PymcuprogSerialUpdiNvmError(msg="NVM error", code=(status >> self.STATUS_WRITE_ERROR_bp))
-
-            if not status & ((1 << self.STATUS_EEPROM_BUSY_bp) | (1 << self.STATUS_FLASH_BUSY_bp)):
-                return True
-
-        self.logger.error("Wait NVM ready timed out")
-        return False
-
-    def execute_nvm_command(self, command):
-        """
-        Executes an NVM COMMAND on the NVM CTRL
-
-        :param command: command to execute
-        :type param: int
-        """
-        self.logger.debug("NVMCMD %d executing", command)
-        return self.readwrite.write_byte(self.device.nvmctrl_address + self.NVMCTRL_CTRLA, command)
@@ -5,13 +5,13 @@ Present on, for example, AVR EA
 """
 from logging import getLogger
 from .nvm import NvmUpdi
-from .timeout import Timeout
-from ..pymcuprog_errors import PymcuprogSerialUpdiNvmTimeout, PymcuprogSerialUpdiNvmError
+from ..pymcuprog_errors import PymcuprogSerialUpdiNvmTimeout
 
 class NvmUpdiP3(NvmUpdi):
     """
     Version P:3 UPDI NVM properties
     """
+    __slots__ = ()
 
     # NVM CTRL peripheral definition
     NVMCTRL_CTRLA = 0x00
@@ -41,6 +41,7 @@ class NvmUpdiP3(NvmUpdi):
     STATUS_WRITE_ERROR_bp = 4
     STATUS_EEPROM_BUSY_bp = 0
     STATUS_FLASH_BUSY_bp = 1
+    STATUS_BUSY_bm = (1 << STATUS_EEPROM_BUSY_bp) | (1 << STATUS_FLASH_BUSY_bp)
 
 
     def __init__(self, readwrite, device):
@@ -56,7 +57,7 @@ class NvmUpdiP3(NvmUpdi):
         self.logger.debug("Chip erase using NVM CTRL")
 
         # Wait until NVM CTRL is ready to erase
-        if not self.wait_nvm_ready():
+        if not self._ensure_ready():
             raise PymcuprogSerialUpdiNvmTimeout("Timeout waiting for NVM controller to be ready before chip erase")
 
         # Erase
@@ -66,7 +67,7 @@ class NvmUpdiP3(NvmUpdi):
         status = self.wait_nvm_ready()
 
         # Remove command
-        self.execute_nvm_command(self.NVMCMD_NOCMD)
+        self.clear_nvm_command()
 
         if not status:
             raise PymcuprogSerialUpdiNvmTimeout("Timeout waiting for NVM controller to be ready after chip erase")
@@ -82,11 +83,11 @@ class NvmUpdiP3(NvmUpdi):
         self.logger.debug("Erase flash page at address 0x%08X", address)
 
         # Wait until NVM CTRL is ready to erase
-        if not self.wait_nvm_ready():
+        if not self._ensure_ready():
             raise PymcuprogSerialUpdiNvmTimeout("Timeout waiting for NVM controller to be ready before flash page erase")
 
         # Dummy write
-        self.readwrite.write_data(address, [0xFF])
+        self.readwrite.write_byte(address, 0xFF)
 
         # Erase
         self.execute_nvm_command(self.NVMCMD_FLASH_PAGE_ERASE)
@@ -95,7 +96,7 @@ class NvmUpdiP3(NvmUpdi):
         status = self.wait_nvm_ready()
 
         # Remove command
-        self.execute_nvm_command(self.NVMCMD_NOCMD)
+        self.clear_nvm_command()
 
         if not status:
             raise PymcuprogSerialUpdiNvmTimeout("Timeout waiting for NVM controller to be ready after flash page erase")
@@ -107,7 +108,7 @@ class NvmUpdiP3(NvmUpdi):
         self.logger.debug("Erase EEPROM")
 
         # Wait until NVM CTRL is ready to erase
-        if not self.wait_nvm_ready():
+        if not self._ensure_ready():
             raise PymcuprogSerialUpdiNvmTimeout("Timeout waiting for NVM controller to be ready before EEPROM erase")
 
         # Erase
@@ -117,7 +118,7 @@ class NvmUpdiP3(NvmUpdi):
         status = self.wait_nvm_ready()
 
         # Remove command
-        self.execute_nvm_command(self.NVMCMD_NOCMD)
+        self.clear_nvm_command()
 
         if not status:
             raise PymcuprogSerialUpdiNvmTimeout("Timeout waiting for NVM controller to be ready after EEPROM erase")
@@ -211,7 +212,7 @@ class NvmUpdiP3(NvmUpdi):
         """
 
         # Check that NVM controller is ready
-        if not self.wait_nvm_ready():
+        if not self._ensure_ready():
             raise PymcuprogSerialUpdiNvmTimeout("Timeout waiting for NVM controller to be ready before page buffer clear")
 
         # Clear the page buffer
@@ -237,39 +238,4 @@ class NvmUpdiP3(NvmUpdi):
             raise PymcuprogSerialUpdiNvmTimeout("Timeout waiting for NVM controller to be ready after page write")
 
         # Remove command
-        self.execute_nvm_command(self.NVMCMD_NOCMD)
-
-    def wait_nvm_ready(self, timeout_ms=100):
-        """
-        Waits for the NVM controller to be ready
-
-        :param timeout_ms: Timeout period in milliseconds
-        :type timeout_ms: int, defaults to 100
-        :returns: True if 'ready', False if timeout occurred before ready
-        :rtype: bool
-        :raises: PymcuprogSerialUpdiNvmError if an error condition is encountered
-        """
-        timeout = Timeout(timeout_ms)
-
-        self.logger.debug("Wait NVM ready")
-        while not timeout.expired():
-            status = self.readwrite.read_byte(self.device.nvmctrl_address + self.NVMCTRL_STATUS)
-            if status & self.STATUS_WRITE_ERROR_bm:
-                self.logger.error("NVM error (%d)", status >> self.STATUS_WRITE_ERROR_bp)
-                raise PymcuprogSerialUpdiNvmError(msg="NVM error", code=(status >> self.STATUS_WRITE_ERROR_bp))
-
-            if not status & ((1 << self.STATUS_EEPROM_BUSY_bp) | (1 << self.STATUS_FLASH_BUSY_bp)):
-                return True
-
-        self.logger.error("Wait NVM ready timed out")
-        return False
-
-    def execute_nvm_command(self, command):
-        """
-        Executes an NVM COMMAND on the NVM CTRL
-
-        :param command: command to execute
-        :type param: int
-        """
-        self.logger.debug("NVMCMD %d executing", command)
-        return self.readwrite.write_byte(self.device.nvmctrl_address + self.NVMCTRL_CTRLA, command)
+        self.clear_nvm_command()
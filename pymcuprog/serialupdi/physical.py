@@ -2,7 +2,7 @@
 Serial driver for UPDI stack
 """
 import time
-from logging import getLogger
+from logging import getLogger, DEBUG
 import serial
 from serial.serialutil import SerialException
 
@@ -66,8 +66,28 @@ class UpdiPhysical:
         except SerialException:
             self.logger.error("Unable to open serial port '%s'", port)
             raise
+        self._set_low_latency_mode()
+
+    def _set_low_latency_mode(self):
+        """
+        Request low latency mode on the serial port
+
+        USB-serial adapters (FTDI in particular) hold back received data for up to 16ms by default, which adds to the
+        round-trip time of every UPDI transaction.  pyserial only supports this on Linux, on other platforms or when
+        the driver does not support it the port is left as is.
+        """
+        if not hasattr(self.ser, 'set_low_latency_mode'):
+            return
+        try:
+            self.ser.set_low_latency_mode(True)
+        except (ValueError, NotImplementedError) as error:
+            # pyserial raises NotImplementedError on POSIX platforms other than Linux
+            self.logger.debug("Low latency mode not available: %s", error)
 
     def _loginfo(self, msg, data):
+        # Formatting every frame is costly, so skip it unless the debug output is going somewhere
+        if not self.logger.isEnabledFor(DEBUG):
+            return
         if data and isinstance(data[0], str):
             i_data = [ord(x) for x in data]
         else:
@@ -75,6 +95,17 @@ class UpdiPhysical:
         data_str = "[" + ", ".join(["0x{:02X}".format(x) for x in i_data]) + "]"
         self.logger.debug("%s : %s", msg, data_str)
 
+    def change_baud(self, baud):
+        """
+        Changes the baud rate of the open serial port
+
+        :param baud: Baud rate in bps to use for communications
+        :type baud: int
+        """
+        self.logger.debug("Changing baud rate to %d", baud)
+        self.ser.baudrate = baud
+        self.baud = baud
+
     def send_double_break(self):
         """
         Sends a double break to reset the UPDI port
@@ -126,28 +157,40 @@ class UpdiPhysical:
         # it will echo back.
         self.ser.read(len(command))
 
-    def receive(self, size):
+    def send_receive(self, command, size):
         """
-        Receives a frame of a known number of chars from UPDI
+        Sends a char array to UPDI and receives a response of a known number of chars
 
-        :param size: bytes to receive
+        The echo of the command and the response are read back in one go, so this takes one serial port read for the
+        whole transaction instead of one read for the echo and one per char in the response
+
+        :param command: command to send
+        :type command: list of bytes
+        :param size: bytes to receive after the echo
         :type size: int
+        :return: response received (without the echo)
+        :rtype: bytearray
         """
-        response = bytearray()
-        timeout = 1
+        self._loginfo("send", command)
 
-        # For each byte
-        while size and timeout:
+        self.ser.write(command)
+
+        # The echo comes back first, followed by the response
+        echo_size = len(command)
+        response = bytearray(self.ser.read(echo_size + size))[echo_size:]
+
+        self._loginfo("receive", response)
+        return response
 
-            # Read
-            character = self.ser.read()
+    def receive(self, size):
+        """
+        Receives a frame of a known number of chars from UPDI
 
-            # Anything in?
-            if character:
-                response.append(ord(character))
-                size -= 1
-            else:
-                timeout -= 1
+        :param size: bytes to receive
+        :type size: int
+        """
+        # A single read waits for the whole frame, or returns what has arrived when the port times out
+        response = bytearray(self.ser.read(size))
 
         self._loginfo("receive", response)
         return response
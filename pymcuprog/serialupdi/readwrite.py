@@ -38,16 +38,27 @@ class UpdiReadWrite(object):
         """
         return self.datalink.stcs(address, value)
 
-    def write_key(self, size, key):
+    def write_cs_multiple(self, writes):
         """
-        Write a KEY into UPDI
+        Write a sequence of values to Control/Status space
+
+        :param writes: (address, value) pairs to write, in order
+        :type writes: list of tuples
+        """
+        return self.datalink.stcs_multiple(writes)
+
+    def write_key_read_status(self, size, key):
+        """
+        Write a KEY into UPDI and read back the key status
 
         :param size: size of key to send
         :type size: int
         :param key: key value
         :type: key bytearray
+        :return: key status
+        :rtype: byte
         """
-        return self.datalink.key(size, key)
+        return self.datalink.key_ldcs(size, key, constants.UPDI_ASI_KEY_STATUS)
 
     def read_sib(self):
         """
@@ -80,6 +91,17 @@ class UpdiReadWrite(object):
         """
         return self.datalink.st(address, value)
 
+    def write_byte_noack(self, address, value):
+        """
+        Writes a single byte to UPDI without waiting for ACKs
+
+        :param address: address to write to
+        :type address: int
+        :param value: value to write
+        :type value: byte
+        """
+        return self.datalink.st_noack(address, value)
+
     def read_data(self, address, size):
         """
         Reads a number of bytes of data from UPDI
@@ -97,11 +119,9 @@ class UpdiReadWrite(object):
         # Store the address
         self.datalink.st_ptr(address)
 
-        # Fire up the repeat
+        # Fire up the repeat and do the read(s)
         if size > 1:
-            self.datalink.repeat(size)
-
-        # Do the read(s)
+            return self.datalink.repeat_ld_ptr_inc(size)
         return self.datalink.ld_ptr_inc(size)
 
     def read_data_words(self, address, words):
@@ -116,17 +136,15 @@ class UpdiReadWrite(object):
         self.logger.debug("Reading %d words from 0x%04X", words, address)
 
         # Range check
-        if words > constants.UPDI_MAX_REPEAT_SIZE >> 1:
+        if words > constants.UPDI_MAX_REPEAT_WORDS:
             raise PymcuprogSerialUpdiProtocolError("UPDI cannot read {} words in one go".format(words))
 
         # Store the address
         self.datalink.st_ptr(address)
 
-        # Fire up the repeat
+        # Fire up the repeat and do the read
         if words > 1:
-            self.datalink.repeat(words)
-
-        # Do the read
+            return self.datalink.repeat_ld_ptr_inc16(words)
         return self.datalink.ld_ptr_inc16(words)
 
     def write_data_words(self, address, data):
@@ -141,7 +159,7 @@ class UpdiReadWrite(object):
         numbytes = len(data)
         # Special-case of 1 word
         if numbytes == 2:
-            value = data[0] + (data[1] << 8)
+            value = data[0] | (data[1] << 8)
             return self.datalink.st16(address, value)
 
         # Range check
@@ -151,9 +169,8 @@ class UpdiReadWrite(object):
         # Store the address
         self.datalink.st_ptr(address)
 
-        # Fire up the repeat
-        self.datalink.repeat(numbytes >> 1)
-        return self.datalink.st_ptr_inc16(data)
+        # Fire up the repeat and write the data
+        return self.datalink.repeat_st_ptr_inc16(data)
 
     def write_data(self, address, data):
         """
@@ -165,27 +182,21 @@ class UpdiReadWrite(object):
         :type data: list of bytes
         """
         numbytes = len(data)
-        # Special case of 1 byte
+        # Special case of 1 byte, anything longer is written as a block which takes fewer round trips
         if numbytes == 1:
             return self.datalink.st(address, data[0])
-        # Special case of 2 byte
-        if numbytes == 2:
-            self.datalink.st(address, data[0])
-            return self.datalink.st(address + 1, data[1])
 
+        datalink = self.datalink
+        max_chunk_size = constants.UPDI_MAX_REPEAT_SIZE
         index = 0
         while numbytes:
-            if numbytes > constants.UPDI_MAX_REPEAT_SIZE:
-                chunk_size = constants.UPDI_MAX_REPEAT_SIZE
-            else:
-                chunk_size = numbytes
+            chunk_size = min(numbytes, max_chunk_size)
 
             # Store the address
-            self.datalink.st_ptr(address)
+            datalink.st_ptr(address)
 
-            # Fire up the repeat
-            self.datalink.repeat(chunk_size)
-            self.datalink.st_ptr_inc(data[index:index+chunk_size])
+            # Fire up the repeat and write the data
+            datalink.repeat_st_ptr_inc(data[index:index+chunk_size])
 
             index += chunk_size
             address += chunk_size
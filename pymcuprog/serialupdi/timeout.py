@@ -1,7 +1,11 @@
 """
 Simple timer helper for UPDI stack
 """
-import time
+try:
+    from time import monotonic
+except ImportError:
+    # Python 2.7 has no monotonic clock
+    from time import time as monotonic
 
 #pylint: disable=too-few-public-methods
 class Timeout:
@@ -18,7 +22,9 @@ class Timeout:
         """
 
         self.timeout_ms = timeout_ms
-        self.start_time = time.time()
+        # The monotonic clock is not affected by changes to the system time
+        self.start_time = monotonic()
+        self.deadline = self.start_time + timeout_ms / 1000.0
 
     def expired(self):
         """
@@ -27,4 +33,4 @@ class Timeout:
         :returns: True if expired, False otherwise
         :rtype: bool
         """
-        return time.time() - self.start_time > self.timeout_ms / 1000.0
+        return monotonic() > self.deadline
@@ -0,0 +1,64 @@
+"""
+Mock factories shared by the serialUPDI stack tests
+"""
+from mock import MagicMock
+from mock import patch
+
+NVMCTRL_ADDRESS = 0x1000
+STATUS_READY = 0x00
+
+
+def start_patch(testcase, target):
+    """
+    Patch a target for the duration of a test
+
+    :param testcase: test case to register the cleanup with
+    :type testcase: unittest.TestCase
+    :param target: target to patch, as given to mock.patch
+    :type target: str
+    :returns: Mock of the patched target
+    """
+    patcher = patch(target)
+    testcase.addCleanup(patcher.stop)
+    return patcher.start()
+
+
+def mock_instance(testcase, target):
+    """
+    Patch a class for the duration of a test and return the mock used for its instances
+
+    :param testcase: test case to register the cleanup with
+    :type testcase: unittest.TestCase
+    :param target: class to patch, as given to mock.patch
+    :type target: str
+    :returns: Mock returned when the patched class is instantiated
+    """
+    instance = MagicMock()
+    start_patch(testcase, target).return_value = instance
+    return instance
+
+
+def mock_device(nvmctrl_address=NVMCTRL_ADDRESS):
+    """
+    Create a mock of the device description used by the NVM drivers
+
+    :param nvmctrl_address: base address of the NVM controller
+    :type nvmctrl_address: int
+    :returns: Mock of Dut instance
+    """
+    device = MagicMock()
+    device.nvmctrl_address = nvmctrl_address
+    return device
+
+
+def mock_readwrite(status=STATUS_READY):
+    """
+    Create a mock of the UpdiReadWrite layer which reports the given NVM controller status
+
+    :param status: value returned for every byte read
+    :type status: int
+    :returns: Mock of UpdiReadWrite instance
+    """
+    readwrite = MagicMock()
+    readwrite.read_byte.return_value = status
+    return readwrite
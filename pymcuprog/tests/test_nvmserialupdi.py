@@ -8,6 +8,8 @@ from mock import patch
 
 from pymcuprog.nvmserialupdi import NvmAccessProviderSerial
 from pymcuprog.deviceinfo import deviceinfo
+from pymcuprog.deviceinfo.deviceinfokeys import DeviceMemoryInfoKeys
+from pymcuprog.deviceinfo.memorynames import MemoryNames
 from pymcuprog.pymcuprog_errors import PymcuprogSessionError
 from pymcuprog.toolconnection import ToolSerialConnection
 
@@ -52,6 +54,16 @@ class TestNvmAccessProviderSerial(unittest.TestCase):
         with self.assertRaises(PymcuprogSessionError):
             id_read = serial.read_device_id()
 
+    def test_start_passes_boost_baudrate_to_enter_progmode(self):
+        mock_updiapplication_instance = self._mock_updiapplication()
+
+        connection = ToolSerialConnection(serialport="COM33", baudrate=115200, boost_baudrate=460800)
+        dinfo = deviceinfo.getdeviceinfo('atmega4809')
+        serial = NvmAccessProviderSerial(connection, dinfo, None)
+        serial.start()
+
+        mock_updiapplication_instance.enter_progmode.assert_called_once_with(boost_baud=460800)
+
     def test_hold_in_reset_does_nothing(self):
         mock_updiapplication = self._mock_updiapplication()
 
@@ -71,3 +83,34 @@ class TestNvmAccessProviderSerial(unittest.TestCase):
         serial.release_from_reset()
 
         mock_updiapplication.leave_progmode.assert_called()
+
+    def test_write_flash_writes_all_pages_in_one_sequence(self):
+        mock_updiapplication = self._mock_updiapplication()
+
+        connection = ToolSerialConnection()
+        dinfo = deviceinfo.getdeviceinfo('atmega4809')
+        serial = NvmAccessProviderSerial(connection, dinfo, None)
+        flash_info = deviceinfo.DeviceMemoryInfo(dinfo).memory_info_by_name(MemoryNames.FLASH)
+        page_size = flash_info[DeviceMemoryInfoKeys.PAGE_SIZE]
+        flash_address = flash_info[DeviceMemoryInfoKeys.ADDRESS]
+
+        serial.write(flash_info, 0, bytearray(2*page_size))
+
+        mock_updiapplication.nvm.write_flash_pages.assert_called_once()
+        pages = list(mock_updiapplication.nvm.write_flash_pages.call_args[0][0])
+        self.assertEqual(pages, [(flash_address, bytearray(page_size)),
+                                 (flash_address + page_size, bytearray(page_size))])
+        mock_updiapplication.nvm.write_flash.assert_not_called()
+
+    def test_write_eeprom_does_not_begin_flash_write(self):
+        mock_updiapplication = self._mock_updiapplication()
+
+        connection = ToolSerialConnection()
+        dinfo = deviceinfo.getdeviceinfo('atmega4809')
+        serial = NvmAccessProviderSerial(connection, dinfo, None)
+        eeprom_info = deviceinfo.DeviceMemoryInfo(dinfo).memory_info_by_name(MemoryNames.EEPROM)
+
+        serial.write(eeprom_info, 0, bytearray(4))
+
+        mock_updiapplication.nvm.write_eeprom.assert_called()
+        mock_updiapplication.nvm.write_flash_pages.assert_not_called()
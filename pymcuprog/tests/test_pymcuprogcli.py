@@ -789,6 +789,20 @@ class TestPymcuprogCLI(unittest.TestCase):
     def test_write_and_verify_bin_to_flash_nedbg_mega4809(
             self, mock_read_tool_info, mock_housekeepingprotocol, mock_avr8protocol):
         # pylint: disable=unused-argument
+        self._write_and_verify_bin_to_flash_mega4809(mock_read_tool_info, mock_avr8protocol)
+
+    @patch('pymcuprog.avr8target.Avr8Protocol')
+    @patch('pymcuprog.backend.housekeepingprotocol')
+    @patch('pymcuprog.backend.read_tool_info')
+    def test_write_bin_with_unknown_size_nedbg_mega4809(
+            self, mock_read_tool_info, mock_housekeepingprotocol, mock_avr8protocol):
+        # pylint: disable=unused-argument
+        # Pipes and other non-regular files do not report the size of the data that can be read from them
+        with patch('pymcuprog.pymcuprog_main.os.fstat') as mock_fstat:
+            mock_fstat.return_value.st_size = 0
+            self._write_and_verify_bin_to_flash_mega4809(mock_read_tool_info, mock_avr8protocol)
+
+    def _write_and_verify_bin_to_flash_mega4809(self, mock_read_tool_info, mock_avr8protocol):
         self.avr8protocol_mock_configure(mock_avr8protocol)
 
         mock_avr8protocol_obj = mock_avr8protocol.return_value
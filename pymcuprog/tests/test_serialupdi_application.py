@@ -0,0 +1,126 @@
+#pylint: disable=missing-docstring
+import unittest
+from mock import MagicMock
+from mock import call
+
+from pymcuprog.serialupdi.application import UpdiApplication, FAST_POLLS, POLL_DELAY_MIN_S, POLL_DELAY_MAX_S
+from pymcuprog.serialupdi import constants
+from pymcuprog.pymcuprog_errors import PymcuprogSerialUpdiError, PymcuprogSerialUpdiProtocolError
+from pymcuprog.tests.serialupdi_mocks import start_patch, mock_instance
+
+BAUD = 115200
+BOOST_BAUD = 460800
+
+
+class TestUpdiApplication(unittest.TestCase):
+    def setUp(self):
+        self.mock_phy = mock_instance(self, "pymcuprog.serialupdi.application.UpdiPhysical")
+        self.mock_phy.baud = BAUD
+        start_patch(self, "pymcuprog.serialupdi.application.UpdiDatalink24bit")
+        self.mock_readwrite = mock_instance(self, "pymcuprog.serialupdi.application.UpdiReadWrite")
+
+        self.app = UpdiApplication("COM1", BAUD)
+        # Report the device as already in NVM programming mode so that enter_progmode goes straight to the boost
+        self.cs_values = {constants.UPDI_ASI_SYS_STATUS: constants.UPDI_ASI_SYS_STATUS_NVMPROG_MASK,
+                          constants.UPDI_CS_STATUSA: 0x30}
+        self.mock_readwrite.read_cs.side_effect = lambda address: self.cs_values[address]
+
+    def _change_baud(self, baud):
+        self.mock_phy.baud = baud
+
+    def test_enter_progmode_without_boost_keeps_baud(self):
+        self.app.enter_progmode()
+
+        self.mock_readwrite.write_cs.assert_not_called()
+        self.mock_phy.change_baud.assert_not_called()
+
+    def test_enter_progmode_boost_switches_clock_and_baud(self):
+        self.app.enter_progmode(boost_baud=BOOST_BAUD)
+
+        self.mock_readwrite.write_cs.assert_called_once_with(constants.UPDI_ASI_CTRLA,
+                                                             constants.UPDI_ASI_CTRLA_UPDICLKSEL_16M)
+        self.mock_phy.change_baud.assert_called_once_with(BOOST_BAUD)
+        self.mock_readwrite.read_cs.assert_called_with(constants.UPDI_CS_STATUSA)
+
+    def test_enter_progmode_boost_skipped_when_already_boosted(self):
+        self.mock_phy.baud = BOOST_BAUD
+
+        self.app.enter_progmode(boost_baud=BOOST_BAUD)
+
+        self.mock_readwrite.write_cs.assert_not_called()
+        self.mock_phy.change_baud.assert_not_called()
+
+    def test_enter_progmode_boost_no_response_restores_clock_and_baud(self):
+        self.cs_values[constants.UPDI_CS_STATUSA] = 0x00
+
+        with self.assertRaises(PymcuprogSerialUpdiError):
+            self.app.enter_progmode(boost_baud=BOOST_BAUD)
+
+        self.assertEqual(self.mock_phy.change_baud.mock_calls, [call(BOOST_BAUD), call(BAUD)])
+        self.assertEqual(self.mock_readwrite.write_cs.mock_calls,
+                         [call(constants.UPDI_ASI_CTRLA, constants.UPDI_ASI_CTRLA_UPDICLKSEL_16M),
+                          call(constants.UPDI_ASI_CTRLA, constants.UPDI_ASI_CTRLA_UPDICLKSEL_4M)])
+
+    def test_enter_progmode_boost_read_error_restores_clock_and_baud(self):
+        def read_cs(address):
+            if address == constants.UPDI_CS_STATUSA:
+                raise PymcuprogSerialUpdiProtocolError("No response")
+            return self.cs_values[address]
+        self.mock_readwrite.read_cs.side_effect = read_cs
+
+        with self.assertRaises(PymcuprogSerialUpdiError):
+            self.app.enter_progmode(boost_baud=BOOST_BAUD)
+
+        self.mock_phy.change_baud.assert_called_with(BAUD)
+        self.mock_readwrite.write_cs.assert_called_with(constants.UPDI_ASI_CTRLA,
+                                                        constants.UPDI_ASI_CTRLA_UPDICLKSEL_4M)
+
+    def test_leave_progmode_restores_baud_after_boost(self):
+        self.mock_phy.change_baud.side_effect = self._change_baud
+        self.app.enter_progmode(boost_baud=BOOST_BAUD)
+
+        self.app.leave_progmode()
+
+        self.assertEqual(self.mock_phy.change_baud.mock_calls, [call(BOOST_BAUD), call(BAUD)])
+
+    def test_leave_progmode_keeps_baud_without_boost(self):
+        self.app.enter_progmode()
+
+        self.app.leave_progmode()
+
+        self.mock_phy.change_baud.assert_not_called()
+
+    def test_leave_progmode_invalidates_nvm_ready(self):
+        self.app.nvm = MagicMock()
+
+        self.app.leave_progmode()
+
+        self.app.nvm.invalidate_ready.assert_called()
+
+    def test_wait_unlocked_polls_without_sleeping_at_first(self):
+        mock_sleep = start_patch(self, "pymcuprog.serialupdi.application.time.sleep")
+        locked = constants.UPDI_ASI_SYS_STATUS_LOCKSTATUS_MASK
+        self.mock_readwrite.read_cs.side_effect = [locked] * (FAST_POLLS - 1) + [0x00]
+
+        self.assertTrue(self.app.wait_unlocked(100))
+
+        mock_sleep.assert_not_called()
+
+    def test_wait_unlocked_backs_off_up_to_the_maximum_delay(self):
+        mock_sleep = start_patch(self, "pymcuprog.serialupdi.application.time.sleep")
+        locked = constants.UPDI_ASI_SYS_STATUS_LOCKSTATUS_MASK
+        self.mock_readwrite.read_cs.side_effect = [locked] * (FAST_POLLS + 4) + [0x00]
+
+        self.assertTrue(self.app.wait_unlocked(100))
+
+        self.assertEqual(mock_sleep.mock_calls, [call(POLL_DELAY_MIN_S), call(POLL_DELAY_MIN_S * 2),
+                                                 call(POLL_DELAY_MAX_S), call(POLL_DELAY_MAX_S),
+                                                 call(POLL_DELAY_MAX_S)])
+
+    def test_wait_urow_prog_waits_for_low(self):
+        urowprog = constants.UPDI_ASI_SYS_STATUS_UROWPROG_MASK
+        self.mock_readwrite.read_cs.side_effect = [urowprog, urowprog, 0x00]
+
+        self.assertTrue(self.app.wait_urow_prog(100, wait_for_high=False))
+
+        self.assertEqual(self.mock_readwrite.read_cs.call_count, 3)
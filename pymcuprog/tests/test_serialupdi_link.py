@@ -0,0 +1,138 @@
+#pylint: disable=missing-docstring
+import unittest
+from mock import MagicMock
+
+from pymcuprog.serialupdi.link import UpdiDatalink, UpdiDatalink16bit
+from pymcuprog.pymcuprog_errors import PymcuprogSerialUpdiProtocolError
+
+SYNC = 0x55
+ACK = 0x40
+REPEAT = 0xA0
+LD8_PTR_INC = 0x24
+LD16_PTR_INC = 0x25
+ST8_PTR_INC = 0x64
+ST16_PTR_INC = 0x65
+STCS_CTRLA = 0xC2
+CTRLA_ACK_ON = 0x80
+CTRLA_ACK_OFF = 0x88
+KEY = 0xE0
+
+
+class TestUpdiDatalink(unittest.TestCase):
+    def setUp(self):
+        self.phy = MagicMock()
+        self.datalink = UpdiDatalink()
+        self.datalink.set_physical(self.phy)
+
+    def test_repeat_out_of_range_raises(self):
+        for size in [0, 257]:
+            with self.assertRaises(PymcuprogSerialUpdiProtocolError):
+                self.datalink.repeat_ld_ptr_inc(size)
+
+        self.phy.send_receive.assert_not_called()
+
+    def test_repeat_ld_ptr_inc(self):
+        for size in [1, 255, 256]:
+            data = bytearray([i & 0xFF for i in range(size)])
+            self.phy.send_receive.return_value = data
+
+            result = self.datalink.repeat_ld_ptr_inc(size)
+
+            self.phy.send_receive.assert_called_with([SYNC, REPEAT, size - 1, SYNC, LD8_PTR_INC], size)
+            self.assertEqual(result, data)
+
+    def test_repeat_ld_ptr_inc_short_read_raises(self):
+        self.phy.send_receive.return_value = bytearray(255)
+
+        with self.assertRaises(PymcuprogSerialUpdiProtocolError):
+            self.datalink.repeat_ld_ptr_inc(256)
+
+    def test_repeat_ld_ptr_inc16(self):
+        for words in [1, 128]:
+            data = bytearray([i & 0xFF for i in range(words * 2)])
+            self.phy.send_receive.return_value = data
+
+            result = self.datalink.repeat_ld_ptr_inc16(words)
+
+            self.phy.send_receive.assert_called_with([SYNC, REPEAT, words - 1, SYNC, LD16_PTR_INC], words * 2)
+            self.assertEqual(result, data)
+
+    def test_repeat_ld_ptr_inc16_short_read_raises(self):
+        self.phy.send_receive.return_value = bytearray(3)
+
+        with self.assertRaises(PymcuprogSerialUpdiProtocolError):
+            self.datalink.repeat_ld_ptr_inc16(2)
+
+    def test_repeat_st_ptr_inc(self):
+        for size in [1, 255, 256]:
+            self.phy.send_receive.reset_mock()
+            self.phy.send_receive.return_value = bytearray([ACK])
+            data = bytearray([i & 0xFF for i in range(size)])
+
+            self.datalink.repeat_st_ptr_inc(data)
+
+            calls = self.phy.send_receive.call_args_list
+            self.assertEqual(len(calls), size)
+            # REPEAT and the store with the first byte go in one frame, each further byte is sent on its own
+            self.assertEqual(calls[0][0], ([SYNC, REPEAT, size - 1, SYNC, ST8_PTR_INC, 0x00], 1))
+            for index in range(1, size):
+                self.assertEqual(calls[index][0], ([data[index]], 1))
+
+    def test_repeat_st_ptr_inc_missing_ack_raises(self):
+        self.phy.send_receive.return_value = bytearray()
+
+        with self.assertRaises(PymcuprogSerialUpdiProtocolError):
+            self.datalink.repeat_st_ptr_inc(bytearray([0x01, 0x02]))
+
+    def test_repeat_st_ptr_inc_missing_data_ack_raises(self):
+        self.phy.send_receive.side_effect = [bytearray([ACK]), bytearray([0x00])]
+
+        with self.assertRaises(PymcuprogSerialUpdiProtocolError):
+            self.datalink.repeat_st_ptr_inc(bytearray([0x01, 0x02]))
+
+    def test_repeat_st_ptr_inc16(self):
+        for words in [1, 255, 256]:
+            data = bytearray([i & 0xFF for i in range(words * 2)])
+
+            self.datalink.repeat_st_ptr_inc16(data)
+
+            expected = bytearray([SYNC, STCS_CTRLA, CTRLA_ACK_OFF,
+                                  SYNC, REPEAT, words - 1,
+                                  SYNC, ST16_PTR_INC]) + data + bytearray([SYNC, STCS_CTRLA, CTRLA_ACK_ON])
+            self.phy.send.assert_called_with(expected)
+
+    def test_st_noack(self):
+        datalink = UpdiDatalink16bit()
+        datalink.set_physical(self.phy)
+
+        datalink.st_noack(0x1000, 0x1FF)
+
+        self.phy.send.assert_called_with([SYNC, STCS_CTRLA, CTRLA_ACK_OFF,
+                                          SYNC, 0x44, 0x00, 0x10, 0xFF,
+                                          SYNC, STCS_CTRLA, CTRLA_ACK_ON])
+
+    def test_repeat(self):
+        self.datalink.repeat(256)
+
+        self.phy.send.assert_called_with([SYNC, REPEAT, 0xFF])
+
+    def test_st_ptr_inc16_sends_block_with_its_own_repeat(self):
+        data = bytearray([0x01, 0x02, 0x03, 0x04])
+
+        self.datalink.st_ptr_inc16(data)
+
+        self.phy.send.assert_called_with(bytearray([SYNC, STCS_CTRLA, CTRLA_ACK_OFF,
+                                                    SYNC, REPEAT, 0x01,
+                                                    SYNC, ST16_PTR_INC]) + data +
+                                         bytearray([SYNC, STCS_CTRLA, CTRLA_ACK_ON]))
+
+    def test_key_is_sent_reversed(self):
+        key = bytearray(b"ABCDEFGH")
+
+        self.datalink.key(0, key)
+
+        self.phy.send.assert_called_with(bytearray([SYNC, KEY]) + bytearray(b"HGFEDCBA"))
+
+    def test_key_with_invalid_length_raises(self):
+        with self.assertRaises(PymcuprogSerialUpdiProtocolError):
+            self.datalink.key(0, bytearray(4))
@@ -0,0 +1,136 @@
+#pylint: disable=missing-docstring
+import unittest
+from mock import patch
+from mock import call
+
+from pymcuprog.serialupdi.nvmp0 import NvmUpdiP0
+from pymcuprog.serialupdi.nvmp2 import NvmUpdiP2
+from pymcuprog.serialupdi.nvmp3 import NvmUpdiP3
+from pymcuprog.serialupdi.nvmp4 import NvmUpdiP4
+from pymcuprog.pymcuprog_errors import PymcuprogSerialUpdiNvmError
+from pymcuprog.tests.serialupdi_mocks import NVMCTRL_ADDRESS, STATUS_READY, mock_device, mock_readwrite
+
+USER_ROW_ADDRESS = 0x1080
+
+
+class TestNvmUpdiUserRow(unittest.TestCase):
+    def _check_user_row_write(self, nvm_class, data, expected_calls):
+        nvm = nvm_class(mock_readwrite(), mock_device())
+
+        with patch.object(nvm_class, "write_nvm") as mock_write_nvm:
+            nvm.write_user_row(USER_ROW_ADDRESS, data)
+
+        self.assertEqual(mock_write_nvm.mock_calls, expected_calls)
+
+    def test_user_row_even_length_is_written_with_word_access(self):
+        for nvm_class in [NvmUpdiP2, NvmUpdiP4]:
+            data = bytearray([0x01, 0x02, 0x03, 0x04])
+            self._check_user_row_write(nvm_class, data,
+                                       [call(USER_ROW_ADDRESS, data, use_word_access=True)])
+
+    def test_user_row_odd_length_writes_last_byte_on_its_own(self):
+        for nvm_class in [NvmUpdiP2, NvmUpdiP4]:
+            data = bytearray([0x01, 0x02, 0x03])
+            self._check_user_row_write(nvm_class, data,
+                                       [call(USER_ROW_ADDRESS, bytearray([0x01, 0x02]), use_word_access=True),
+                                        call(USER_ROW_ADDRESS + 2, bytearray([0x03]), use_word_access=False)])
+
+    def test_user_row_single_byte_is_written_with_byte_access(self):
+        for nvm_class in [NvmUpdiP2, NvmUpdiP4]:
+            data = bytearray([0x01])
+            self._check_user_row_write(nvm_class, data,
+                                       [call(USER_ROW_ADDRESS, bytearray([0x01]), use_word_access=False)])
+
+
+    def test_p3_user_row_erase_erases_the_user_row_page(self):
+        readwrite = mock_readwrite()
+        nvm = NvmUpdiP3(readwrite, mock_device())
+
+        nvm.erase_user_row(USER_ROW_ADDRESS, 64)
+
+        readwrite.write_byte.assert_any_call(USER_ROW_ADDRESS, 0xFF)
+        readwrite.write_byte.assert_any_call(NVMCTRL_ADDRESS, NvmUpdiP3.NVMCMD_FLASH_PAGE_ERASE)
+        readwrite.write_byte_noack.assert_called_once_with(NVMCTRL_ADDRESS, NvmUpdiP3.NVMCMD_NOCMD)
+
+
+class TestNvmUpdiReady(unittest.TestCase):
+    def setUp(self):
+        self.mock_readwrite = mock_readwrite()
+
+    def _create_nvm(self, nvm_class):
+        nvm = nvm_class(self.mock_readwrite, mock_device())
+        # Start from a controller known to be ready
+        self.assertTrue(nvm.wait_nvm_ready())
+        self.mock_readwrite.reset_mock()
+        return nvm
+
+    def _assert_polled_before_command(self, nvm):
+        """
+        Checks that the NVM controller status was read before the first command was written
+        """
+        self.assertEqual(self.mock_readwrite.mock_calls[0], call.read_byte(nvm.status_address))
+
+    def test_ready_controller_is_not_polled_again(self):
+        for nvm_class in [NvmUpdiP0, NvmUpdiP2]:
+            nvm = self._create_nvm(nvm_class)
+
+            nvm.erase_eeprom()
+
+            self.assertNotEqual(self.mock_readwrite.mock_calls[0], call.read_byte(nvm.status_address))
+
+    def test_ready_is_invalidated_by_timeout(self):
+        for nvm_class in [NvmUpdiP0, NvmUpdiP2]:
+            nvm = self._create_nvm(nvm_class)
+            self.mock_readwrite.read_byte.return_value = nvm_class.STATUS_BUSY_bm
+
+            self.assertFalse(nvm.wait_nvm_ready(timeout_ms=0))
+            self.mock_readwrite.read_byte.return_value = STATUS_READY
+            self.mock_readwrite.reset_mock()
+            nvm.erase_eeprom()
+
+            self._assert_polled_before_command(nvm)
+
+    def test_ready_is_invalidated_by_error(self):
+        for nvm_class in [NvmUpdiP0, NvmUpdiP2]:
+            nvm = self._create_nvm(nvm_class)
+            self.mock_readwrite.read_byte.return_value = nvm_class.STATUS_WRITE_ERROR_bm
+
+            with self.assertRaises(PymcuprogSerialUpdiNvmError):
+                nvm.wait_nvm_ready()
+            with self.assertRaises(PymcuprogSerialUpdiNvmError):
+                nvm.erase_eeprom()
+
+            self.mock_readwrite.write_byte.assert_not_called()
+
+    def test_ready_is_invalidated_by_nvm_command(self):
+        for nvm_class in [NvmUpdiP0, NvmUpdiP2]:
+            nvm = self._create_nvm(nvm_class)
+
+            nvm.execute_nvm_command(0x01)
+            self.mock_readwrite.reset_mock()
+            nvm.erase_eeprom()
+
+            self._assert_polled_before_command(nvm)
+
+    def test_ready_is_invalidated_explicitly(self):
+        nvm = self._create_nvm(NvmUpdiP2)
+
+        nvm.invalidate_ready()
+        nvm.erase_eeprom()
+
+        self._assert_polled_before_command(nvm)
+
+
+class TestNvmUpdiFlashPages(unittest.TestCase):
+    def test_flash_pages_are_written_under_one_command(self):
+        for nvm_class in [NvmUpdiP2, NvmUpdiP4]:
+            readwrite = mock_readwrite()
+            nvm = nvm_class(readwrite, mock_device())
+
+            nvm.write_flash_pages([(0x800000, bytearray(4)), (0x800004, bytearray(4))])
+
+            self.assertEqual(readwrite.write_byte.mock_calls,
+                             [call(NVMCTRL_ADDRESS, nvm_class.NVMCMD_FLASH_WRITE)])
+            self.assertEqual(readwrite.write_data_words.mock_calls,
+                             [call(0x800000, bytearray(4)), call(0x800004, bytearray(4))])
+            readwrite.write_byte_noack.assert_called_once_with(NVMCTRL_ADDRESS, nvm_class.NVMCMD_NOCMD)
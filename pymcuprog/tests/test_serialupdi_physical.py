@@ -0,0 +1,59 @@
+#pylint: disable=missing-docstring
+import unittest
+
+from pymcuprog.serialupdi.physical import UpdiPhysical
+from pymcuprog.tests.serialupdi_mocks import mock_instance
+
+
+class TestUpdiPhysical(unittest.TestCase):
+    def _mock_serial(self):
+        """
+        Create a mock of the pyserial Serial instance used in pymcuprog.serialupdi.physical
+
+        :returns: Mock of Serial instance
+        """
+        return mock_instance(self, "pymcuprog.serialupdi.physical.serial.Serial")
+
+    def test_low_latency_mode_is_requested(self):
+        mock_serial = self._mock_serial()
+
+        UpdiPhysical("COM1")
+
+        mock_serial.set_low_latency_mode.assert_called_with(True)
+
+    def test_low_latency_mode_not_implemented_is_ignored(self):
+        mock_serial = self._mock_serial()
+        mock_serial.set_low_latency_mode.side_effect = NotImplementedError("Low latency not supported")
+
+        phy = UpdiPhysical("COM1")
+
+        self.assertIs(phy.ser, mock_serial)
+
+    def test_low_latency_mode_not_supported_by_driver_is_ignored(self):
+        mock_serial = self._mock_serial()
+        mock_serial.set_low_latency_mode.side_effect = ValueError("Failed to update ASYNC_LOW_LATENCY flag")
+
+        phy = UpdiPhysical("COM1")
+
+        self.assertIs(phy.ser, mock_serial)
+
+    def test_send_receive_strips_echo(self):
+        mock_serial = self._mock_serial()
+        mock_serial.read.return_value = bytearray([0x55, 0x80, 0x30])
+
+        phy = UpdiPhysical("COM1")
+        response = phy.send_receive([0x55, 0x80], 1)
+
+        mock_serial.write.assert_called_with([0x55, 0x80])
+        mock_serial.read.assert_called_with(3)
+        self.assertEqual(response, bytearray([0x30]))
+
+    def test_send_receive_short_read_returns_short_response(self):
+        mock_serial = self._mock_serial()
+        # Echo received, but only part of the response
+        mock_serial.read.return_value = bytearray([0x55, 0x24, 0x01])
+
+        phy = UpdiPhysical("COM1")
+        response = phy.send_receive([0x55, 0x24], 2)
+
+        self.assertEqual(response, bytearray([0x01]))
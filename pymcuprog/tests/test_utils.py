@@ -0,0 +1,95 @@
+#pylint: disable=missing-docstring
+import unittest
+from io import StringIO
+from mock import patch
+
+from pymcuprog import utils
+
+
+class TestCompare(unittest.TestCase):
+    def test_compare_equal_data_passes(self):
+        utils.compare(bytearray([0x01, 0x02, 0x03, 0x04]), bytearray([0x01, 0x02, 0x03, 0x04]), 0)
+
+    def test_compare_length_mismatch_raises(self):
+        with self.assertRaises(ValueError):
+            utils.compare(bytearray([0x01, 0x02]), bytearray([0x01]), 0)
+
+    def test_compare_mismatch_at_first_byte_reports_location(self):
+        with self.assertRaises(ValueError) as context:
+            utils.compare(bytearray([0x00, 0x02, 0x03, 0x04]), bytearray([0x01, 0x02, 0x03, 0x04]), 0x100)
+
+        self.assertEqual(str(context.exception), "Verify mismatch starting at location 0x000100: 0x00 vs 0x01")
+
+    def test_compare_mismatch_at_last_byte_reports_location(self):
+        with self.assertRaises(ValueError) as context:
+            utils.compare(bytearray([0x01, 0x02, 0x03, 0x04]), bytearray([0x01, 0x02, 0x03, 0x05]), 0x100)
+
+        self.assertEqual(str(context.exception), "Verify mismatch starting at location 0x000103: 0x04 vs 0x05")
+
+    def test_compare_mixed_mask_ignores_masked_bits(self):
+        # PIC style 14-bit words, the top bits of every second byte are not compared
+        utils.compare(bytearray([0xFF, 0xFF, 0x12, 0x34]), bytearray([0xFF, 0x3F, 0x12, 0xF4]), 0,
+                      verify_mask=[0xFF, 0x3F])
+
+    def test_compare_mixed_mask_detects_unmasked_bits(self):
+        with self.assertRaises(ValueError) as context:
+            utils.compare(bytearray([0xFF, 0x3F, 0x12, 0x34]), bytearray([0xFF, 0x3F, 0x12, 0x35]), 0,
+                          verify_mask=[0xFF, 0x3F])
+
+        self.assertEqual(str(context.exception), "Verify mismatch starting at location 0x000003: 0x34 vs 0x35")
+
+    def test_compare_list_data(self):
+        with self.assertRaises(ValueError):
+            utils.compare([0x01, 0x02], [0x01, 0x03], 0)
+
+
+class TestShowdata(unittest.TestCase):
+    # Expected output is as printed by showdata before the output was collected into a single print
+
+    def _showdata(self, *args, **kwargs):
+        with patch("sys.stdout", new_callable=StringIO) as mock_stdout:
+            utils.showdata(*args, **kwargs)
+        return mock_stdout.getvalue()
+
+    def test_showdata_unaligned_address(self):
+        expected = (
+            "---------------------------------------------------------\n"
+            "0x000010: 30 31 32 33 34 35 36 37 38 39 3A 3B 3C 3D 3E 3F \n"
+            "0x000020: 40 41 42 43 xx xx xx xx xx xx xx xx xx xx xx xx \n"
+            "---------------------------------------------------------\n"
+        )
+
+        self.assertEqual(self._showdata(bytearray(range(0x30, 0x44)), address=0x10), expected)
+
+    def test_showdata_paged(self):
+        expected = (
+            "---------------------------------\n"
+            "0x000000: xx xx xx xx xx F0 F1 F2 \n"
+            "\n"
+            "0x000008: F3 F4 F5 F6 F7 F8 F9 FA \n"
+            "\n"
+            "0x000010: FB FC xx xx xx xx xx xx \n"
+            "---------------------------------\n"
+        )
+
+        self.assertEqual(self._showdata(bytearray(range(0xF0, 0xFD)), address=5, page_size=8), expected)
+
+    def test_showdata_phantom_bytes(self):
+        expected = (
+            "---------------------------------\n"
+            "0x000000: xx xx xx xx 12 xx 34 xx \n"
+            "0x000008: 56 xx 78 xx 9A xx xx xx \n"
+            "---------------------------------\n"
+        )
+
+        self.assertEqual(self._showdata(bytearray([0x12, 0x34, 0x56, 0x78, 0x9A]), address=3, line_wrap=8,
+                                        phantom_bytes=1), expected)
+
+    def test_showdata_single_full_line(self):
+        expected = (
+            "---------------------------------------------------------\n"
+            "0x000000: AA AA AA AA AA AA AA AA AA AA AA AA AA AA AA AA \n"
+            "---------------------------------------------------------\n"
+        )
+
+        self.assertEqual(self._showdata(bytearray([0xAA]*16), address=0, line_wrap=16), expected)
@@ -34,7 +34,7 @@ class ToolSerialConnection(ToolConnection):
     """
     serialport = None
 
-    def __init__(self, serialport="COM1", baudrate=DEFAULT_SERIALUPDI_BAUD, timeout=None):
+    def __init__(self, serialport="COM1", baudrate=DEFAULT_SERIALUPDI_BAUD, timeout=None, boost_baudrate=None):
         """
         :param serialport: Serial port name to connect to.
         :type serialport: str
@@ -43,7 +43,11 @@ class ToolSerialConnection(ToolConnection):
         :param timeout: timeout value for serial reading.
             When UPDI is not enabled, attempting to read will return after this timeout period.
         :type timeout: float
+        :param boost_baudrate: baud rate in bps to switch to once in programming mode, after raising the UPDI clock.
+            Set to None to keep using baudrate for the whole session.
+        :type boost_baudrate: int (defaults to None)
         """
         self.serialport = serialport
         self.baudrate = baudrate
         self.timeout = timeout
+        self.boost_baudrate = boost_baudrate
@@ -163,6 +163,16 @@ def compare(data0, data1, offset, verify_mask=None):
     if len(data0) != len(data1):
         raise ValueError("Length mismatch on verify")
 
+    # When no bits are masked out the data can be compared in one go, the byte by byte compare below is then only
+    # needed to find the location of a mismatch
+    if all(mask == 0xFF for mask in verify_mask):
+        try:
+            if bytearray(data0) == bytearray(data1):
+                return
+        except (TypeError, ValueError):
+            # Not plain byte values, leave it to the masked compare
+            pass
+
     mask_len = len(verify_mask)
 
     for i in range(0, len(data0), mask_len):
@@ -189,51 +199,58 @@ def showdata(data, address=0, page_size=None, line_wrap=16, phantom_bytes=0):
     if word_index:
         address += (1 + phantom_bytes) - word_index
 
-    # Cannot print more per line than the page size (page size <= 2 is interpreted as no paging)
-    if page_size is not None and page_size > 2:
+    # page size <= 2 is interpreted as no paging
+    paged = page_size is not None and page_size > 2
+
+    # Cannot print more per line than the page size
+    if paged:
         if line_wrap > page_size:
             line_wrap = page_size
 
-    print("-"*(line_wrap*3+9))
+    # The output is collected and printed in one go as printing each value separately is slow for large memories
+    output = []
+    output.append("-"*(line_wrap*3+9) + "\n")
 
     # Page alignment
     rows = 0
 
-    # page size <= 2 is interpreted as no paging
-    if page_size is not None and page_size > 2:
+    if paged:
         page = address % page_size
         rows = int(page / line_wrap)
         for row in range(rows):
-            print("0x{0:06X}: ".format(address-page+row*line_wrap), end='')
-            print("xx "*line_wrap, end='')
-            print("")
+            output.append("0x{0:06X}: ".format(address-page+row*line_wrap))
+            output.append("xx "*line_wrap)
+            output.append("\n")
 
     print_index = 0
 
     # Calculate offset from aligned data
     div = address % line_wrap
 
-    print("0x{0:06X}: ".format(address-div), end='')
+    output.append("0x{0:06X}: ".format(address-div))
     # Add some empty bytes
-    print("xx "*div, end='')
+    output.append("xx "*div)
     print_index += div
 
     # keep track of page wraps
     wrap = False
 
+    # Text to print for each possible data value, including any phantom bytes
+    phantom = "xx "*phantom_bytes
+    value_text = ["{0:02X} {1}".format(value, phantom) for value in range(256)]
+    print_step = 1 + phantom_bytes
+    last_index = len(data)+div
+
     for data_index, value in enumerate(data, div+1):
-        print("{0:02X} ".format(value), end='')
-        for i in range(phantom_bytes):
-            print("xx ", end='')
-        print_index += 1 + phantom_bytes
-        # page size <= 2 is interpreted as no paging
-        if page_size is not None and page_size > 2:
-            if (print_index+(rows*line_wrap)) % page_size == 0 and data_index != len(data)+div:
-                print("")
+        output.append(value_text[value])
+        print_index += print_step
+        if paged:
+            if (print_index+(rows*line_wrap)) % page_size == 0 and data_index != last_index:
+                output.append("\n")
                 wrap = True
-        if print_index % line_wrap == 0 and data_index != len(data)+div or wrap:
-            print("")
-            print("0x{0:06X}: ".format(address-div + print_index), end='')
+        if print_index % line_wrap == 0 and data_index != last_index or wrap:
+            output.append("\n")
+            output.append("0x{0:06X}: ".format(address-div + print_index))
             wrap = False
 
     # Figure out how many extra empty data positions to print
@@ -241,9 +258,10 @@ def showdata(data, address=0, page_size=None, line_wrap=16, phantom_bytes=0):
     if extra % line_wrap == 0:
         extra = 0
 
-    print("xx "*extra, end='')
-    print("")
-    print("-"*(line_wrap*3+9))
+    output.append("xx "*extra)
+    output.append("\n")
+    output.append("-"*(line_wrap*3+9))
+    print("".join(output))
 
 
 def pagealign(data, address, page_size, data_size=1):